@@ -0,0 +1,154 @@
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from utils.http import get_session
+
+logger = logging.getLogger(__name__)
+
+# (status, response text, parsed JSON body) for one submitted article
+ArticleResult = Tuple[Optional[int], Optional[str], Dict]
+
+
+async def post_article(base_url: str, article: Dict) -> ArticleResult:
+    """POST a single article to /api/article_import."""
+    try:
+        async with get_session().post(
+            f"{base_url}/api/article_import",
+            json=article,
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as resp:
+            text = await resp.text()
+            data = {}
+            if resp.status == 201:
+                try:
+                    data = await resp.json(content_type=None)
+                except Exception:
+                    data = {}
+            return resp.status, text, data
+    except Exception as e:
+        logger.warning("Error posting to API: %s", e)
+        return None, None, {}
+
+
+async def post_articles_bulk(base_url: str, articles: List[Dict]) -> Optional[List[ArticleResult]]:
+    """
+    POST several articles to /api/article_import_bulk as {"articles": [...]}.
+    The endpoint answers with {"results": [...]}, one entry per article in order,
+    each shaped like the single-import response plus a "status" code; like the
+    single endpoint, 201 means the article was created. A failed entry should
+    carry an "error" (or "message") field, which is passed on as the response text.
+
+    Returns None only when the server says the bulk endpoint doesn't exist (404/405),
+    i.e. nothing was imported and the articles can safely be posted one by one.
+    Any other failure may have happened after the batch was committed, so it is
+    reported as a per-article error instead of being retried.
+    """
+    try:
+        async with get_session().post(
+            f"{base_url}/api/article_import_bulk",
+            json={"articles": articles},
+            timeout=aiohttp.ClientTimeout(total=10 + len(articles)),
+        ) as resp:
+            if resp.status in (404, 405):
+                return None
+            text = await resp.text()
+            if resp.status not in (200, 201, 207):
+                return [(resp.status, text, {})] * len(articles)
+            try:
+                body = await resp.json(content_type=None)
+            except Exception:
+                body = None
+    except Exception as e:
+        logger.warning("Error posting bulk articles to API: %s", e)
+        return [(None, f"Bulk import failed: {e}", {})] * len(articles)
+
+    results = body.get("results") if isinstance(body, dict) else None
+    if (not isinstance(results, list) or len(results) != len(articles)
+            or not all(isinstance(item, dict) for item in results)):
+        logger.warning("Malformed bulk import response (HTTP %s): %.200s", resp.status, text)
+        return [(resp.status, f"Malformed bulk import response: {text[:500]}", {})] * len(articles)
+
+    return [
+        (item.get("status", 201), item.get("error") or item.get("message") or json.dumps(item), item)
+        for item in results
+    ]
+
+
+class ArticleBatcher:
+    """
+    Coalesces article submissions into bulk POSTs.
+
+    An article submitted while nothing else is queued or in flight is posted
+    straight away. Otherwise it is queued and flushed with the others when the
+    in-flight POST finishes, when `max_batch_size` is reached, or at the latest
+    `max_queue_time` seconds after the first queued item. A batch of one uses
+    the regular single-article endpoint, as does every batch when the API has
+    no bulk endpoint; callers always get a per-article result.
+    """
+
+    def __init__(self, base_url: str, max_batch_size: int = 16, max_queue_time: float = 0.25):
+        self.base_url = base_url
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self._pending: List[Tuple[Dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._flushing: set = set()  # strong refs so in-flight flushes aren't collected
+
+    async def submit(self, article: Dict) -> ArticleResult:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((article, future))
+
+        # Only coalesce under concurrency; a lone archive shouldn't wait for the timer
+        if len(self._pending) >= self.max_batch_size or (len(self._pending) == 1 and not self._flushing):
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.max_queue_time)
+        self._timer = None
+        self._flush_now()
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        task = asyncio.create_task(self._flush(self._take()))
+        self._flushing.add(task)
+        task.add_done_callback(self._flushing.discard)
+
+    def _take(self) -> List[Tuple[Dict, asyncio.Future]]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    async def _flush(self, batch: List[Tuple[Dict, asyncio.Future]]):
+        if not batch:
+            return
+        try:
+            results = await self.process_batch([article for article, _ in batch])
+        except Exception as e:
+            results = [(None, str(e), {})] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+        # Send what queued up behind this POST instead of waiting for the timer
+        if self._pending and self._flushing <= {asyncio.current_task()}:
+            self._flush_now()
+
+    async def process_batch(self, articles: List[Dict]) -> List[ArticleResult]:
+        if len(articles) == 1:
+            return [await post_article(self.base_url, articles[0])]
+
+        results = await post_articles_bulk(self.base_url, articles)
+        if results is None:
+            # Bulk endpoint missing: nothing was imported, post them one by one
+            results = await asyncio.gather(*(post_article(self.base_url, a) for a in articles))
+        return list(results)
@@ -1,13 +1,15 @@
 import os
 import re
 import asyncio
-from datetime import datetime
+import traceback
+from datetime import datetime, timezone
 from typing import Optional
 import json
-import requests
+import logging
 import discord
 
-from utils.text import extract_urls_from_text
+from bot.article_batcher import ArticleBatcher
+from utils.text import split_urls_from_text, registered_domain
 from utils.normalize import (
     normalize_title,
     normalize_subtitle,
@@ -18,14 +20,51 @@ from utils.normalize import (
 from utils.markdown import parse_markdown_headings
 from extractors.link import extract_link_metadata
 from extractors.media import extract_media_from_message, DEFAULT_PLACEHOLDER
+from extractors.twitter import is_video_url
+
+logger = logging.getLogger(__name__)
 
 API_BASE_URL = os.getenv("API_URL", "").rstrip("/")
+if not API_BASE_URL:
+    logger.warning("API_URL is not set; archiving is disabled.")
+
+# Concurrent archives are coalesced into bulk imports
+article_batcher = ArticleBatcher(API_BASE_URL)
+
+# URLs are dropped and whitespace runs collapsed in the same pass
+_SUBTITLE_CLEAN_RE = re.compile(r'(?:\s*https?://\S+)+\s*|\s+')
+
+
+# Hosts whose links are always archived as video; anything else is decided by the media URL
+_MEDIA_DISPATCH = {
+    "youtube.com": "video",
+    "youtu.be": "video",
+    "tiktok.com": "video",
+}
+# Link-only messages only force YouTube; a TikTok link's type follows its media URL
+_LINK_ONLY_DISPATCH = {
+    "youtube.com": "video",
+    "youtu.be": "video",
+}
+
+
+def guess_media_type(source_url: str, media_url: Optional[str], dispatch: dict = _MEDIA_DISPATCH) -> str:
+    """Pick "video" or "image" for an article from its source link and media URL."""
+    forced = dispatch.get(registered_domain(source_url))
+    if forced:
+        return forced
+    return "video" if is_video_url(media_url) else "image"
 
 
 # ---------- Main archive processing ----------
 
 async def process_archive(interaction: discord.Interaction, message: discord.Message):
     """Background task to process and archive a message."""
+    # Nothing to send the article to; skip the (slow) extraction entirely
+    if not API_BASE_URL:
+        await interaction.followup.send("❌ API not configured.", ephemeral=True)
+        return
+
     try:
         msg = message
         raw_text = msg.content or ""
@@ -35,8 +74,8 @@ async def process_archive(interaction: discord.Interaction, message: discord.Mes
         media_url: Optional[str] = None
         media_type: str = "image"  # default media type
 
-        urls = extract_urls_from_text(raw_text)
-        content_without_urls = re.sub(r'https?://[^\s]+', '', raw_text).strip()
+        urls, content_without_urls = split_urls_from_text(raw_text)
+        content_without_urls = content_without_urls.strip()
         is_link_only = bool(urls and not content_without_urls and not msg.attachments)
 
         # -----------------------------
@@ -48,12 +87,7 @@ async def process_archive(interaction: discord.Interaction, message: discord.Mes
             meta_title, meta_subtitle, meta_media, meta_content, note = await extract_link_metadata(url)
 
             # Determine media type
-            url_lower = url.lower()
-            if any(platform in url_lower for platform in ['youtube', 'youtu.be']):
-                media_type = "video"
-            elif meta_media:
-                from extractors.twitter import is_video_url
-                media_type = "video" if is_video_url(meta_media) else "image"
+            media_type = guess_media_type(url, meta_media, _LINK_ONLY_DISPATCH)
 
             title = meta_title or "Untitled"
             subtitle = meta_subtitle
@@ -74,11 +108,18 @@ async def process_archive(interaction: discord.Interaction, message: discord.Mes
             title = md_title or "Untitled"
             subtitle = md_subtitle
             cleaned_content = md_cleaned
-            media_url = await extract_media_from_message(msg)
+
+            # Media and link metadata are independent fetches; run them concurrently
+            media_task = asyncio.create_task(extract_media_from_message(msg))
+            if urls:
+                link_task = asyncio.create_task(extract_link_metadata(urls[0]))
+                media_url, link_result = await asyncio.gather(media_task, link_task)
+            else:
+                media_url = await media_task
 
             # If title/content is empty and we have URLs, try link metadata
             if urls:
-                meta_title, meta_subtitle, meta_media, meta_content, note = await extract_link_metadata(urls[0])
+                meta_title, meta_subtitle, meta_media, meta_content, note = link_result
                 if meta_title:
                     if not title or title == "Untitled":
                         title = meta_title
@@ -98,18 +139,7 @@ async def process_archive(interaction: discord.Interaction, message: discord.Mes
 
                 # Determine media type from URL
                 if media_url and media_url != DEFAULT_PLACEHOLDER:
-                    from extractors.twitter import is_video_url
-                    # Check URL patterns to determine if it's video
-                    url_lower = urls[0].lower()
-                    if any(platform in url_lower for platform in ['tiktok', 'youtube', 'youtu.be']):
-                        media_type = "video"
-                    elif 'twitter.com' in url_lower or 'x.com' in url_lower:
-                        media_type = "video" if is_video_url(media_url) else "image"
-                    elif 'instagram.com' in url_lower:
-                        # Instagram can be either - check if media_url is video
-                        media_type = "video" if is_video_url(media_url) else "image"
-                    else:
-                        media_type = "video" if is_video_url(media_url) else "image"
+                    media_type = guess_media_type(urls[0], media_url)
 
             # Fallback: if cleaned_content still empty, use raw message
             if not cleaned_content or not cleaned_content.strip():
@@ -118,8 +148,10 @@ async def process_archive(interaction: discord.Interaction, message: discord.Mes
 
             # Candidate subtitle if missing
             if not subtitle:
-                cleaned_for_subtitle = re.sub(r'https?://\S+', '', cleaned_content)
-                cleaned_for_subtitle = re.sub(r'\s+', ' ', cleaned_for_subtitle).strip().rstrip('<>')
+                cleaned_for_subtitle = _SUBTITLE_CLEAN_RE.sub(
+                    lambda m: ' ' if m.group(0)[0].isspace() or m.group(0)[-1].isspace() else '',
+                    cleaned_content
+                ).strip().rstrip('<>')
                 subtitle = cleaned_for_subtitle[:600] if cleaned_for_subtitle else None
 
         # Normalize and truncate fields
@@ -157,30 +189,21 @@ async def process_archive(interaction: discord.Interaction, message: discord.Mes
             "author": author_data,  # Send as dict, not string
             "category": None,
             "published_date": (
-                msg.created_at.isoformat() if getattr(msg, "created_at", None)
-                else datetime.utcnow().isoformat()
-            )
+                msg.created_at or datetime.now(timezone.utc)
+            ).isoformat()
         }
 
-        print(f"DEBUG - Article data being sent: title={title[:50]}, subtitle={subtitle[:50] if subtitle else None}, "
-              f"content_length={len(cleaned_content)}, media_type={media_type}, media_url={media_url[:100] if media_url else None}")
-
-        # POST to API
-        def post_article():
-            try:
-                return requests.post(f"{API_BASE_URL}/api/article_import", json=article_data, timeout=10)
-            except Exception as e:
-                print("Error posting to API:", e)
-                return None
-
-        resp = await asyncio.to_thread(post_article)
-
-        if resp and resp.status_code == 201:
-            try:
-                response_data = resp.json()
-            except Exception:
-                response_data = {}
-            actual_slug = response_data.get("slug", base_slug)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Article data being sent: title=%.50s, subtitle=%.50s, content_length=%d, media_type=%s, media_url=%.100s",
+                title, subtitle, len(cleaned_content), media_type, media_url
+            )
+
+        # POST to API (coalesced with other concurrent archives)
+        status, resp_text, response_data = await article_batcher.submit(article_data)
+
+        if status == 201:
+            actual_slug = (response_data or {}).get("slug", base_slug)
             article_url = f"{API_BASE_URL.rstrip('/')}/article/{actual_slug}"
             await interaction.followup.send(
                 f"✅ Article saved: **{title}**" +
@@ -189,8 +212,8 @@ async def process_archive(interaction: discord.Interaction, message: discord.Mes
                 ephemeral=True
             )
         else:
-            text_preview = (resp.text[:1900] if resp is not None and hasattr(resp, "text") else "No response")
-            status = resp.status_code if resp is not None else "NoResponse"
+            text_preview = resp_text[:1900] if resp_text is not None else "No response"
+            status = status if status is not None else "NoResponse"
             await interaction.followup.send(
                 f"⚠️ API returned {status}:\n```\n{text_preview}\n```",
                 ephemeral=True
@@ -201,5 +224,4 @@ async def process_archive(interaction: discord.Interaction, message: discord.Mes
             f"⚠️ Unexpected error:\n```\n{str(e)[:1900]}\n```",
             ephemeral=True
         )
-        import traceback
         traceback.print_exc()
\ No newline at end of file
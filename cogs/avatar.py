@@ -3,12 +3,14 @@ import os
 import discord
 from discord import app_commands
 from discord.ext import commands
-import aiohttp
 
 
 GUILD_ID = os.getenv("GUILD_ID")
 guild = discord.Object(id=GUILD_ID)
 
+# Discord rejects avatars above this size anyway; don't download more than that
+MAX_AVATAR_BYTES = 10_000_000
+
 
 class Avatar(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -41,15 +43,31 @@ class Avatar(commands.Cog):
             if file:
                 data = await file.read()
             else:
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url) as resp:
-                        if resp.status != 200:
+                async with self.bot.http_session.get(url) as resp:
+                    if resp.status != 200:
+                        await interaction.followup.send(
+                            "❌ Failed to fetch the image from URL.", ephemeral=True
+                        )
+                        return
+
+                    size = resp.content_length
+                    if size and size > MAX_AVATAR_BYTES:
+                        await interaction.followup.send(
+                            "❌ Image is too large (max 10 MB).", ephemeral=True
+                        )
+                        return
+
+                    # Content-Length is the encoded size and the body may arrive decompressed,
+                    # so stream with a running cap rather than trusting it
+                    buf = bytearray()
+                    async for chunk in resp.content.iter_chunked(64 * 1024):
+                        buf += chunk
+                        if len(buf) > MAX_AVATAR_BYTES:
                             await interaction.followup.send(
-                                "❌ Failed to fetch the image from URL.", ephemeral=True
+                                "❌ Image is too large (max 10 MB).", ephemeral=True
                             )
                             return
-                        data = await resp.read()
+                    data = bytes(buf)
 
             await self.bot.user.edit(avatar=data)
             await interaction.followup.send("✅ Avatar changed successfully!", ephemeral=True)
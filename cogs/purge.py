@@ -50,7 +50,7 @@ class Purge(commands.Cog):
     async def purge(self, interaction: discord.Interaction, amount: int = None, depth: int = None):
         # --- Permission checks ---
         if not interaction.user.guild_permissions.administrator:
-            if ALLOWED_ROLE_ID not in [role.id for role in interaction.user.roles]:
+            if not any(role.id == ALLOWED_ROLE_ID for role in interaction.user.roles):
                 await interaction.response.send_message(
                     "❌ You do not have permission to use this command.", ephemeral=True
                 )
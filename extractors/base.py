@@ -1,5 +1,12 @@
 from bs4 import BeautifulSoup
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+# Prefer the C-based lxml parser; fall back to the stdlib parser if it isn't installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
 
 def get_meta_content(soup: BeautifulSoup, prop: str, attr: str = "property") -> Optional[str]:
     tag = soup.find('meta', attrs={attr: prop})
@@ -7,3 +14,28 @@ def get_meta_content(soup: BeautifulSoup, prop: str, attr: str = "property") ->
         return tag.get('content').strip()
     return None
 
+
+def get_tree_meta_content(tree, prop: str, attr: str = "property") -> Optional[str]:
+    """Same as get_meta_content, for an lxml.html element tree."""
+    for content in tree.xpath(f"//meta[@{attr}=$prop]/@content", prop=prop):
+        content = content.strip()
+        if content:
+            return content
+    return None
+
+
+def collect_tree_meta_contents(tree) -> Dict[Tuple[str, str], str]:
+    """
+    Every <meta> content of an lxml.html tree in one pass, keyed by
+    ("property" | "name", value). The first non-empty content for a key wins.
+    """
+    metas: Dict[Tuple[str, str], str] = {}
+    for tag in tree.iter('meta'):
+        content = (tag.get('content') or '').strip()
+        if not content:
+            continue
+        for attr in ('property', 'name'):
+            key = tag.get(attr)
+            if key:
+                metas.setdefault((attr, key), content)
+    return metas
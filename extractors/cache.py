@@ -0,0 +1,36 @@
+# extractors/cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Small in-memory LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float = 3600, maxsize: int = 512):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._d: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._d.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._d[key]
+            return None
+        self._d.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._d[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._d.move_to_end(key)
+        while len(self._d) > self.maxsize:
+            self._d.popitem(last=False)
+
+    def clear(self) -> None:
+        self._d.clear()
+
+    def __len__(self) -> int:
+        return len(self._d)
@@ -1,36 +1,92 @@
 # extractors/instagram.py
 import re
 import json
+import logging
+import orjson
 from typing import Optional, Tuple
 from bs4 import BeautifulSoup
 
-from extractors.base import get_meta_content
+from extractors.base import get_meta_content, HTML_PARSER
+from utils import driver_pool
 from utils.selenium_utils import (
-    create_driver,
-    quit_driver,
     load_instagram_page,
     extract_media_from_selenium
 )
 from utils.normalize import normalize_title, normalize_subtitle
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_PLACEHOLDER = "https://dummyimage.com/600x400/e0e0e0/555.png&text=No+Image"
 
+_INSTA_ID_RE = re.compile(r'instagram\.com/(?:p|reel|tv)/([A-Za-z0-9_-]+)')
+# One pass over the page source picks up both video and display_url candidates
+_INSTA_MEDIA_RE = re.compile(
+    r'"(?:video_url|playback_url)":\s*"(?P<vurl>https://[^"]+)"'
+    r'|videoUrl":"(?P<vurl2>https://[^"]+)"'
+    r'|"src":\s*"(?P<src>https://[^"]+\.mp4[^"]*)"'
+    r'|"display_url":\s*"(?P<dimg>https://[^"]+)"'
+)
+_INSTA_TITLE_SUFFIX_RE = re.compile(r'\s*(?:on Instagram|•\s*Instagram).*$', re.IGNORECASE)
+_FIRST_SENT_RE = re.compile(r'[^.!?]*')
+_URL_USERNAME_RE = re.compile(r'instagram\.com/([^/]+)/')
+_USERNAME_MARKER_RE = re.compile(r'"username"')
+_USERNAME_RE = re.compile(r'"username":\s*"([^"]+)"')
+_LIKES_RE = re.compile(r'\d+[KM]?\s+(?:likes?|comments?|views?)', re.IGNORECASE)
+
 
 def extract_instagram_id(url: str) -> Optional[str]:
     """Extract Instagram post ID from various URL formats."""
-    patterns = [
-        r'instagram\.com/p/([A-Za-z0-9_-]+)',
-        r'instagram\.com/reel/([A-Za-z0-9_-]+)',
-        r'instagram\.com/tv/([A-Za-z0-9_-]+)',
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    match = _INSTA_ID_RE.search(url)
+    if match:
+        return match.group(1)
     return None
 
 
+def unescape_json_url(raw: str) -> str:
+    """Decode JSON string escapes (\\/, \\u0026, ...) in a URL captured from page source."""
+    if '\\' not in raw:
+        return raw
+    # A capture stopping at an escaped quote ends in a lone backslash; drop it
+    # so the C JSON decoder can handle the rest in one call
+    if raw.endswith('\\') and (len(raw) - len(raw.rstrip('\\'))) % 2:
+        raw = raw[:-1]
+    try:
+        return json.loads(f'"{raw}"')
+    except ValueError:
+        return raw.replace(r'\/', '/').replace('\\u0026', '&')
+
+
+def scan_page_media(page_source: str) -> Tuple[list, list]:
+    """
+    Scan page source once for embedded media URLs.
+    Returns (video_urls, display_urls) as raw (still JSON-escaped) strings.
+    """
+    video_urls = []
+    display_urls = []
+    for m in _INSTA_MEDIA_RE.finditer(page_source):
+        dimg = m.group('dimg')
+        if dimg:
+            display_urls.append(dimg)
+        else:
+            video_urls.append(m.group('vurl') or m.group('vurl2') or m.group('src'))
+    return video_urls, display_urls
+
+
+def _iter_jsonld(soup: BeautifulSoup, limit: int = 8):
+    """Yield the JSON-LD objects (dicts) embedded in the page, skipping invalid blocks."""
+    for script_tag in soup.find_all("script", type="application/ld+json", limit=limit):
+        raw = script_tag.string
+        if not raw:
+            continue
+        try:
+            json_data = orjson.loads(raw)
+        except orjson.JSONDecodeError as e:
+            logger.debug("Error parsing JSON-LD: %s", e)
+            continue
+        if isinstance(json_data, dict):
+            yield json_data
+
+
 def is_reel_url(url: str) -> bool:
     """Check if URL is a reel."""
     return '/reel/' in url
@@ -42,71 +98,63 @@ async def get_instagram_metadata(url: str) -> Tuple[
     Extract title, subtitle, media URL, content, and media type from an Instagram URL.
     Returns (title, subtitle, media_url, content, media_type)
     """
-    print(f"DEBUG - get_instagram_metadata called with: {url}")
+    logger.debug("get_instagram_metadata called with: %s", url)
 
     # Handle kkinstagram URLs by converting to regular instagram
     if 'kkinstagram.com' in url:
         url = url.replace('kkinstagram.com', 'instagram.com')
-        print(f"DEBUG - Converted kkinstagram URL to: {url}")
+        logger.debug("Converted kkinstagram URL to: %s", url)
 
     driver = None
     try:
         # Extract post ID and check if it's a reel
         post_id = extract_instagram_id(url)
         if not post_id:
-            print(f"DEBUG - Could not extract Instagram post ID")
+            logger.debug("Could not extract Instagram post ID")
             return None, None, None, None, None
 
         is_reel = is_reel_url(url)
-        print(f"DEBUG - Extracted post ID: {post_id}, is_reel: {is_reel}")
+        logger.debug("Extracted post ID: %s, is_reel: %s", post_id, is_reel)
 
-        # Create driver
-        driver = await create_driver()
+        # Borrow a warm driver from the pool
+        driver = await driver_pool.acquire()
 
         # Load page
         page_source = await load_instagram_page(driver, url)
-        soup = BeautifulSoup(page_source, 'html.parser')
+        soup = BeautifulSoup(page_source, HTML_PARSER)
 
         # Initialize variables
         media_url = None
         media_type = "video" if is_reel else "image"
+        scanned = None  # (video_urls, display_urls), filled lazily from page_source
 
         # ============ EXTRACT MEDIA URL WITH SELENIUM ============
         media_url, media_type = await extract_media_from_selenium(driver, is_reel=is_reel)
 
         # For reels, try additional extraction methods
         if is_reel and not media_url:
-            print(f"DEBUG - Attempting reel-specific extraction")
-
-            # Try to find video element in page source with various patterns
-            video_patterns = [
-                r'"video_url":\s*"(https://[^"]+)"',
-                r'"playback_url":\s*"(https://[^"]+)"',
-                r'"src":\s*"(https://[^"]+\.mp4[^"]*)"',
-                r'videoUrl":"(https://[^"]+)"',
-            ]
-
-            for pattern in video_patterns:
-                matches = re.findall(pattern, page_source)
-                if matches:
-                    # Filter out thumbnail URLs (they often contain 'thumbnail' or have play buttons)
-                    video_matches = [m for m in matches if 'thumbnail' not in m.lower()]
-                    if video_matches:
-                        # Get the longest/highest quality URL
-                        media_url = max(video_matches, key=len).replace(r'\/', '/').replace('\\u0026', '&')
-                        print(f"DEBUG - Found video URL via pattern: {media_url[:100]}")
-                        media_type = "video"
-                        break
+            logger.debug("Attempting reel-specific extraction")
+
+            # Try to find video URLs embedded in the page source
+            if scanned is None:
+                scanned = scan_page_media(page_source)
+            # Filter out thumbnail URLs (they often contain 'thumbnail' or have play buttons)
+            video_matches = [m for m in scanned[0] if 'thumbnail' not in m.lower()]
+            if video_matches:
+                # Get the longest/highest quality URL
+                media_url = unescape_json_url(max(video_matches, key=len))
+                logger.debug("Found video URL via pattern: %.100s", media_url)
+                media_type = "video"
 
         # Fallback to meta tags from page source
         if not media_url:
-            print(f"DEBUG - Falling back to meta tag extraction")
+            logger.debug("Falling back to meta tag extraction")
 
             # For reels, prioritize video meta tags
             if is_reel:
                 video_url = get_meta_content(soup, 'og:video') or get_meta_content(soup, 'og:video:secure_url')
                 if video_url:
-                    print(f"DEBUG - Found video URL in meta: {video_url[:100]}")
+                    logger.debug("Found video URL in meta: %.100s", video_url)
                     media_url = video_url
                     media_type = "video"
 
@@ -114,12 +162,12 @@ async def get_instagram_metadata(url: str) -> Tuple[
             if not media_url:
                 image_url = get_meta_content(soup, 'og:image')
                 if image_url:
-                    print(f"DEBUG - Found og:image: {image_url[:100]}")
+                    logger.debug("Found og:image: %.100s", image_url)
                     # For reels, only use og:image as absolute fallback and mark it appropriately
                     if is_reel:
                         # Check if this is a low-quality thumbnail (often has dimensions in URL)
                         if 'thumbnail' in image_url.lower() or 's150x150' in image_url or 's320x320' in image_url:
-                            print(f"DEBUG - Skipping low-quality thumbnail for reel")
+                            logger.debug("Skipping low-quality thumbnail for reel")
                         else:
                             media_url = image_url
                             # Keep as video type but we only have thumbnail
@@ -129,61 +177,56 @@ async def get_instagram_metadata(url: str) -> Tuple[
 
         # Try JSON-LD structured data
         if not media_url:
-            print(f"DEBUG - Trying JSON-LD extraction")
-            for script_tag in soup.find_all("script", type="application/ld+json"):
-                try:
-                    json_data = json.loads(script_tag.string)
-                    if isinstance(json_data, dict):
-                        # For VideoObject
-                        if json_data.get('@type') == 'VideoObject':
-                            if 'contentUrl' in json_data:
-                                media_url = json_data['contentUrl']
-                                media_type = "video"
-                                print(f"DEBUG - Found video in VideoObject: {media_url[:100]}")
-                                break
-                        # For general image/contentUrl
-                        if 'image' in json_data:
-                            img = json_data['image']
-                            media_url = img[0] if isinstance(img, list) else img
-                            print(f"DEBUG - Found image in JSON-LD: {media_url[:100]}")
-                            break
-                        if 'contentUrl' in json_data:
-                            media_url = json_data['contentUrl']
-                            print(f"DEBUG - Found contentUrl in JSON-LD: {media_url[:100]}")
-                            break
-                except Exception as e:
-                    print(f"DEBUG - Error parsing JSON-LD: {e}")
-                    continue
+            logger.debug("Trying JSON-LD extraction")
+            for json_data in _iter_jsonld(soup):
+                # For VideoObject
+                if json_data.get('@type') == 'VideoObject' and 'contentUrl' in json_data:
+                    media_url = json_data['contentUrl']
+                    media_type = "video"
+                    logger.debug("Found video in VideoObject: %.100s", media_url)
+                    break
+                # For general image/contentUrl
+                if 'image' in json_data:
+                    img = json_data['image']
+                    media_url = img[0] if isinstance(img, list) else img
+                    logger.debug("Found image in JSON-LD: %.100s", media_url)
+                    break
+                if 'contentUrl' in json_data:
+                    media_url = json_data['contentUrl']
+                    logger.debug("Found contentUrl in JSON-LD: %.100s", media_url)
+                    break
 
         # Try extracting from page scripts (display_url for images)
         if not media_url and not is_reel:
-            print(f"DEBUG - Trying to extract from page scripts")
-            script_pattern = r'"display_url":\s*"(https://[^"]+)"'
-            matches = re.findall(script_pattern, page_source)
+            logger.debug("Trying to extract from page scripts")
+            if scanned is None:
+                scanned = scan_page_media(page_source)
+            matches = scanned[1]
             if matches:
                 # Get longest URL (usually full-size)
-                media_url = max(matches, key=len).replace(r'\/', '/')
-                print(f"DEBUG - Found display_url in scripts: {media_url[:100]}")
+                media_url = unescape_json_url(max(matches, key=len))
+                logger.debug("Found display_url in scripts: %.100s", media_url)
                 media_type = "image"
 
         # For reels without video URL, try to get high-quality image
         if not media_url and is_reel:
-            print(f"DEBUG - Trying to extract high-quality image for reel")
+            logger.debug("Trying to extract high-quality image for reel")
             # Try display_url which is usually higher quality
-            display_pattern = r'"display_url":\s*"(https://[^"]+)"'
-            matches = re.findall(display_pattern, page_source)
+            if scanned is None:
+                scanned = scan_page_media(page_source)
+            matches = scanned[1]
             if matches:
                 # Filter out thumbnails and get highest quality
                 hq_images = [m for m in matches if 'thumbnail' not in m.lower()
                              and 's150x150' not in m and 's320x320' not in m]
                 if hq_images:
-                    media_url = max(hq_images, key=len).replace(r'\/', '/')
-                    print(f"DEBUG - Found high-quality display_url for reel: {media_url[:100]}")
+                    media_url = unescape_json_url(max(hq_images, key=len))
+                    logger.debug("Found high-quality display_url for reel: %.100s", media_url)
                     media_type = "video"  # Keep as video type since it's a reel
 
         # Use placeholder if nothing found
         if not media_url:
-            print(f"DEBUG - No media URL found, using placeholder")
+            logger.debug("No media URL found, using placeholder")
             media_url = DEFAULT_PLACEHOLDER
             # Keep original media_type determination
             if not is_reel:
@@ -197,13 +240,12 @@ async def get_instagram_metadata(url: str) -> Tuple[
         )
 
         if title:
-            title = re.sub(r'\s*on Instagram.*$', '', title, flags=re.IGNORECASE)
-            title = re.sub(r'\s*•\s*Instagram.*$', '', title, flags=re.IGNORECASE)
+            title = _INSTA_TITLE_SUFFIX_RE.sub('', title)
 
         if not title or title.lower().startswith('instagram'):
             description = get_meta_content(soup, 'og:description')
             if description:
-                first_sentence = re.split(r'[.!?]', description)[0]
+                first_sentence = _FIRST_SENT_RE.match(description).group(0)
                 title = first_sentence[:100] if len(first_sentence) > 100 else first_sentence
 
         title_suffix = "Instagram Reel" if is_reel else "Instagram Post"
@@ -212,7 +254,7 @@ async def get_instagram_metadata(url: str) -> Tuple[
         # ============ EXTRACT SUBTITLE (USERNAME) ============
         subtitle = None
 
-        username_match = re.search(r'instagram\.com/([^/]+)/', url)
+        username_match = _URL_USERNAME_RE.search(url)
         if username_match:
             subtitle = f"@{username_match.group(1)}"
 
@@ -223,9 +265,9 @@ async def get_instagram_metadata(url: str) -> Tuple[
 
         if not subtitle:
             try:
-                script_tag = soup.find("script", string=re.compile(r'"username"'))
+                script_tag = soup.find("script", string=_USERNAME_MARKER_RE)
                 if script_tag:
-                    match = re.search(r'"username":\s*"([^"]+)"', script_tag.string)
+                    match = _USERNAME_RE.search(script_tag.string)
                     if match:
                         subtitle = f"@{match.group(1)}"
             except:
@@ -241,24 +283,22 @@ async def get_instagram_metadata(url: str) -> Tuple[
         )
 
         if content:
-            content = re.sub(r'\d+[KM]?\s+(?:likes?|comments?|views?)', '', content, flags=re.IGNORECASE)
+            content = _LIKES_RE.sub('', content)
             content = content.strip()
 
         if not content or not content.strip():
             content = title
 
-        print(f"DEBUG - FINAL: title={title[:50]}, subtitle={subtitle}, media_type={media_type}")
-        print(f"DEBUG - FINAL: media_url={media_url[:100] if media_url else None}")
+        logger.debug("FINAL: title=%.50s, subtitle=%s, media_type=%s", title, subtitle, media_type)
+        logger.debug("FINAL: media_url=%.100s", media_url)
 
         return title, subtitle, media_url, content, media_type
 
     except Exception as e:
-        print(f"ERROR in get_instagram_metadata: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_instagram_metadata: %s", e)
         return None, None, None, None, None
 
     finally:
-        # Clean up driver
+        # Return driver to the pool
         if driver:
-            await quit_driver(driver)
\ No newline at end of file
+            await driver_pool.release(driver)
\ No newline at end of file
@@ -1,12 +1,13 @@
-import re
-from urllib.parse import urlparse
 from typing import Optional, Tuple
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 import discord
 from discord import Interaction
 
 from utils.http import http_get
-from extractors.base import get_meta_content
+from utils.text import normalize_url, registered_domain
+from extractors.cache import TTLCache
+from extractors.base import get_tree_meta_content
 from extractors.youtube import get_youtube_metadata
 from extractors.twitter import get_twitter_metadata
 from extractors.tiktok import get_tiktok_metadata
@@ -15,101 +16,127 @@ from extractors.reddit import get_reddit_metadata
 
 from utils.normalize import normalize_title, normalize_subtitle
 
+_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+
+# Where the article body usually lives, in priority order
+_MAIN_CONTENT_XPATHS = (
+    '(//main)[1]',
+    '(//article)[1]',
+    "(//*[contains(translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'content')"
+    " or contains(translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'article')"
+    " or contains(translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'post')])[1]",
+)
+
+# Registered domain -> (extractor, note shown to the user on success)
+LINK_EXTRACTORS = {
+    "youtube.com": (get_youtube_metadata, None),
+    "youtu.be": (get_youtube_metadata, None),
+    "twitter.com": (get_twitter_metadata, None),
+    "x.com": (get_twitter_metadata, None),
+    "fxtwitter.com": (get_twitter_metadata, None),
+    "vxtwitter.com": (get_twitter_metadata, None),
+    "fixupx.com": (get_twitter_metadata, None),
+    "fixvx.com": (get_twitter_metadata, None),
+    "instagram.com": (get_instagram_metadata, "Instagram links are not fully supported. Please verify manually."),
+    "kkinstagram.com": (get_instagram_metadata, "Instagram links are not fully supported. Please verify manually."),
+    "ddinstagram.com": (get_instagram_metadata, "Instagram links are not fully supported. Please verify manually."),
+    "tiktok.com": (get_tiktok_metadata, "TikTok links are not fully supported. Please verify manually."),
+    "reddit.com": (get_reddit_metadata, "Reddit posts may contain multiple media items. Only the first item is used."),
+}
+
+# Scrapes (Selenium ones especially) are expensive; reuse recent results per URL
+_METADATA_CACHE = TTLCache(ttl=3600, maxsize=512)
+# TikTok media URLs are signed CDN links that expire; always scrape these afresh
+_UNCACHED_DOMAINS = frozenset(("tiktok.com",))
+
 
 async def extract_link_metadata(url: str, timeout: int = 10) -> Tuple[
     Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]:
     """
     Extract title, subtitle, media_url, content, and optional note.
+    Successful results are cached per normalized URL for an hour.
     Returns: title, subtitle, media_url, content, note
     """
+    key = normalize_url(url)
+    result = _METADATA_CACHE.get(key)
+    if result is None:
+        result = await _extract_link_metadata(url, timeout)
+        if result is None:
+            return None, None, None, None, None
+        if result[0] and registered_domain(url) not in _UNCACHED_DOMAINS:
+            _METADATA_CACHE.set(key, result)
+
+    # Cached bodies leave the URL out; end with the one this caller linked
+    title, subtitle, media_url, content, note = result
+    content = f"{content}\n\n{url}" if content else url
+    return title, subtitle, media_url, content, note
+
+
+async def _extract_link_metadata(url: str, timeout: int) -> Optional[Tuple[
+        Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]]:
+    """
+    extract_link_metadata without the link appended to the content, so the result
+    can be shared between URLs that normalize alike. None when nothing was found.
+    """
     note: Optional[str] = None
-    parsed = urlparse(url)
-    domain = parsed.netloc.lower()
 
-    # YouTube
-    if "youtube.com" in domain or "youtu.be" in domain:
-        title, subtitle, media_url, content, media_type = await get_youtube_metadata(url)
-        if title:
-            content = f"{content}\n\n{url}" if content else f"{title}\n\n{url}"
-            return title, subtitle, media_url, content, note
-        return None, None, None, None, note
+    # Platform-specific extractors
+    handler = LINK_EXTRACTORS.get(registered_domain(url))
+    if handler:
+        extractor, platform_note = handler
+        title, subtitle, media_url, content, media_type = await extractor(url)
 
-    # Twitter/X
-    if any(d in domain for d in ("twitter.com", "x.com", "fxtwitter.com", "vxtwitter.com")):
-        title, subtitle, media_url, content, media_type = await get_twitter_metadata(url)
-        if title:
-            content = f"{content}\n\n{url}" if content else f"{title}\n\n{url}"
-            return title, subtitle, media_url, content, note
-        return None, None, None, None, note
+        # TikTok always returns something usable (placeholder + link) even without a title
+        if extractor is get_tiktok_metadata:
+            return title, subtitle, media_url, content, platform_note
 
-    # Instagram
-    if "instagram.com" in domain:
-        title, subtitle, media_url, content, media_type = await get_instagram_metadata(url)
-        if title:
-            note = "Instagram links are not fully supported. Please verify manually."
-            content = f"{content}\n\n{url}" if content else f"{title}\n\n{url}"
-            return title, subtitle, media_url, content, note
-        return None, None, None, None, note
-
-    # TikTok
-    if "tiktok.com" in domain:
-        title, subtitle, media_url, content, media_type = await get_tiktok_metadata(url)
-        note = "TikTok links are not fully supported. Please verify manually."
-        content = f"{content}\n\n{url}" if content else url
-        return title, subtitle, media_url, content, note
-
-    # Reddit
-    if "reddit.com" in domain:
-        title, subtitle, media_url, content, media_type = await get_reddit_metadata(url)
         if title:
-            note = "Reddit posts may contain multiple media items. Only the first item is used."
-            content = f"{content}\n\n{url}" if content else f"{title}\n\n{url}"
-            return title, subtitle, media_url, content, note
-        return None, None, None, None, note
+            return title, subtitle, media_url, content or title, platform_note
+        return None
 
     # Standard HTML metadata extraction
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-    resp = await http_get(url, headers=headers, timeout=timeout)
+    resp = await http_get(url, headers=_HEADERS, timeout=timeout)
     if not resp or resp.status_code != 200:
-        return None, None, None, None, note
+        return None
 
-    soup = BeautifulSoup(resp.content, 'html.parser')
+    try:
+        tree = lxml.html.fromstring(resp.content)
+    except (etree.ParserError, ValueError):
+        return None
 
     # Title
-    title = get_meta_content(soup, 'og:title') or \
-            get_meta_content(soup, 'twitter:title', attr='name') or \
-            (soup.title.string.strip() if soup.title and soup.title.string else None)
+    title = get_tree_meta_content(tree, 'og:title') or \
+            get_tree_meta_content(tree, 'twitter:title', attr='name') or \
+            (tree.findtext('.//title') or '').strip() or None
 
     # Subtitle
-    subtitle = get_meta_content(soup, 'og:description') or \
-               get_meta_content(soup, 'description', attr='name') or \
-               get_meta_content(soup, 'twitter:description', attr='name')
+    subtitle = get_tree_meta_content(tree, 'og:description') or \
+               get_tree_meta_content(tree, 'description', attr='name') or \
+               get_tree_meta_content(tree, 'twitter:description', attr='name')
 
     # Media
-    media_url = get_meta_content(soup, 'og:video') or \
-                get_meta_content(soup, 'og:image') or \
-                get_meta_content(soup, 'twitter:image', attr='name')
+    media_url = get_tree_meta_content(tree, 'og:video') or \
+                get_tree_meta_content(tree, 'og:image') or \
+                get_tree_meta_content(tree, 'twitter:image', attr='name')
 
     # Extract main content
-    for s in soup(["script", "style"]):
-        s.decompose()
-
-    main_content = soup.find('main') or soup.find('article') or soup.find(
-        class_=re.compile(r'content|article|post', re.I))
-    paras = main_content.find_all('p', limit=2) if main_content else soup.find_all('p', limit=2)
+    etree.strip_elements(tree, 'script', 'style', with_tail=False)
 
-    extracted_content = ""
-    if paras:
-        parts = [p.get_text(separator=' ', strip=True) for p in paras if p.get_text(strip=True)]
-        extracted_content = "\n\n".join(parts)
+    main_content = next((found[0] for found in (tree.xpath(xp) for xp in _MAIN_CONTENT_XPATHS) if found), tree)
+    paras = main_content.xpath('(.//p)[position()<=2]')
 
-    body_content = f"{extracted_content}\n\n{url}" if extracted_content else url
+    parts = []
+    for p in paras:
+        text = ' '.join(t.strip() for t in p.itertext() if t.strip())
+        if text:
+            parts.append(text)
+    extracted_content = "\n\n".join(parts)
 
     # Normalize
     title = normalize_title(title)
     subtitle = normalize_subtitle(subtitle)
 
-    return title, subtitle, media_url, body_content, note
+    return title, subtitle, media_url, extracted_content, note
 
 
 async def send_metadata_message(
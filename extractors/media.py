@@ -1,9 +1,9 @@
 import re
-from urllib.parse import urlparse
+import asyncio
 from typing import Optional
 import discord
 
-from utils.text import extract_urls_from_text
+from utils.text import extract_urls_from_text, registered_domain
 from extractors.twitter import get_twitter_metadata
 from extractors.youtube import get_youtube_metadata
 from extractors.instagram import get_instagram_metadata
@@ -11,67 +11,105 @@ from extractors.tiktok import get_tiktok_metadata
 
 DEFAULT_PLACEHOLDER = "https://dummyimage.com/600x400/e0e0e0/555.png&text=No+Image"
 
+_VIMEO_RE = re.compile(r"vimeo\.com/(\d+)")
+
+
+async def _get_vimeo_media(url: str):
+    """Vimeo (simple fallback): canonical video URL, no page fetch."""
+    m = _VIMEO_RE.search(url)
+    media = f"https://vimeo.com/{m.group(1)}" if m else None
+    return None, None, media, None, "video"
+
+
+# These borrow a pooled Selenium driver and drive it from a worker thread. Cancelling
+# them would hand the driver back to the pool while the thread is still using it,
+# so a losing probe is left to finish (and release its driver) in the background.
+_DRIVER_EXTRACTORS = frozenset((get_tiktok_metadata, get_instagram_metadata))
+_background_probes = set()
+
+
+def _forget_probe(task: asyncio.Task):
+    _background_probes.discard(task)
+    if not task.cancelled():
+        task.exception()  # result is unused; mark any error as retrieved
+
+
+# Registered domain -> extractor returning (title, subtitle, media_url, content, media_type)
+MEDIA_EXTRACTORS = {
+    "twitter.com": get_twitter_metadata,
+    "x.com": get_twitter_metadata,
+    "fxtwitter.com": get_twitter_metadata,
+    "vxtwitter.com": get_twitter_metadata,
+    "fixupx.com": get_twitter_metadata,
+    "fixvx.com": get_twitter_metadata,
+    "youtube.com": get_youtube_metadata,
+    "youtu.be": get_youtube_metadata,
+    "tiktok.com": get_tiktok_metadata,
+    "instagram.com": get_instagram_metadata,
+    "kkinstagram.com": get_instagram_metadata,
+    "ddinstagram.com": get_instagram_metadata,
+    "vimeo.com": _get_vimeo_media,
+}
+
 
 async def extract_media_from_message(msg: discord.Message) -> str:
     """
     Extract media from a Discord message.
     Priority: attachments > platform-specific extractors > embeds > placeholder
     """
-    # 1. Video attachments
-    for att in msg.attachments:
-        if getattr(att, "content_type", None) and att.content_type.startswith("video/"):
-            return att.url
-
-    # 2. Image attachments
+    # 1./2. Attachments: first video wins, otherwise first image (single pass)
+    first_image = None
     for att in msg.attachments:
-        if getattr(att, "content_type", None) and att.content_type.startswith("image/"):
+        ct = att.content_type or ""
+        if ct.startswith("video/"):
             return att.url
+        if first_image is None and ct.startswith("image/"):
+            first_image = att.url
+    if first_image:
+        return first_image
 
-    # 3. URLs in message - use platform-specific extractors
-    urls = extract_urls_from_text(msg.content or "")
-    for url in urls:
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
-
-        # Twitter/X
-        if any(d in domain for d in ("twitter.com", "x.com", "fxtwitter.com", "vxtwitter.com")):
-            _, _, media, _, _ = await get_twitter_metadata(url)
-            if media and media != DEFAULT_PLACEHOLDER:
-                return media
+    # 3. URLs in message - probe platform-specific extractors concurrently,
+    #    first usable media wins and the remaining probes are cancelled
+    tasks = []
+    uncancellable = set()
+    for url in extract_urls_from_text(msg.content or ""):
+        extractor = MEDIA_EXTRACTORS.get(registered_domain(url))
+        if extractor:
+            task = asyncio.create_task(extractor(url))
+            tasks.append(task)
+            if extractor in _DRIVER_EXTRACTORS:
+                uncancellable.add(task)
 
-        # YouTube
-        if "youtube.com" in domain or "youtu.be" in domain:
-            _, _, media, _, _ = await get_youtube_metadata(url)
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                _, _, media, _, _ = await next_done
+            except Exception:
+                continue
             if media and media != DEFAULT_PLACEHOLDER:
                 return media
-
-        # TikTok
-        if "tiktok.com" in domain:
-            _, _, media, _, _ = await get_tiktok_metadata(url)
-            if media and media != DEFAULT_PLACEHOLDER:
-                return media
-
-        # Instagram
-        if "instagram.com" in domain or "kkinstagram.com" in domain:
-            _, _, media, _, _ = await get_instagram_metadata(url)
-            if media and media != DEFAULT_PLACEHOLDER:
-                return media
-
-        # Vimeo (simple fallback)
-        if "vimeo.com" in domain:
-            m = re.search(r"vimeo\.com/(\d+)", url)
-            if m:
-                return f"https://vimeo.com/{m.group(1)}"
+    finally:
+        for t in tasks:
+            if t.done():
+                continue
+            if t in uncancellable:
+                _background_probes.add(t)
+                t.add_done_callback(_forget_probe)
+            else:
+                t.cancel()
 
     # 4. Discord embeds
     for embed in msg.embeds:
-        if getattr(embed, "image", None) and getattr(embed.image, "url", None):
-            return embed.image.url
-        if getattr(embed, "thumbnail", None) and getattr(embed.thumbnail, "url", None):
-            return embed.thumbnail.url
-        if getattr(embed, "video", None) and getattr(embed.video, "url", None):
-            if not any(d in embed.video.url for d in ("youtube.com", "youtu.be")):
-                return embed.video.url
+        # Embed proxies return None for missing fields, so no getattr needed
+        u = embed.image.url
+        if u:
+            return u
+        u = embed.thumbnail.url
+        if u:
+            return u
+        u = embed.video.url
+        if u and "youtube.com" not in u and "youtu.be" not in u:
+            return u
 
     # 5. Fallback
-    return DEFAULT_PLACEHOLDER
\ No newline at end of file
+    return DEFAULT_PLACEHOLDER
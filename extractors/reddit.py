@@ -1,16 +1,56 @@
 import asyncio
-import json
+import logging
 import re
 from typing import Optional, Tuple
 from bs4 import BeautifulSoup
-import httpx
+import ijson
 
-from utils.text import extract_urls_from_text
+from utils.http import get_reddit_client
+from utils.text import extract_urls_from_text, normalize_url
 from utils.normalize import normalize_title, normalize_subtitle
-from extractors.base import get_meta_content
+from extractors.base import get_meta_content, HTML_PARSER
+from extractors.cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_PLACEHOLDER = "https://dummyimage.com/600x400/e0e0e0/555.png&text=No+Image"
 
+_REDDIT_POST_ID_RE = re.compile(r'/comments/([a-z0-9]+)')
+_IMG_EXTS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+_VIDEO_EXTS = ('.mp4', '.webm', '.mov')
+
+# Request headers are constant, so build them once and share them across calls
+_BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+}
+_JSON_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; RedditExtractor/1.0)",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+# Popular posts get reposted; remember /s/ resolutions and parsed posts for an hour
+_RESOLVE_CACHE = TTLCache(ttl=3600, maxsize=1024)
+_METADATA_CACHE = TTLCache(ttl=3600, maxsize=1024)
+
+
+class _AsyncByteReader:
+    """Minimal async file-like wrapper so ijson can consume an httpx byte stream."""
+
+    def __init__(self, chunks):
+        self._chunks = chunks.__aiter__()
+
+    async def read(self, n: int = -1) -> bytes:
+        if n == 0:
+            return b""
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b""
+
 
 def normalize_reddit_url(url: str) -> str:
     """
@@ -38,49 +78,48 @@ async def resolve_reddit_search_link(url: str) -> Optional[str]:
     Resolves a /s/... search link to the first /comments/... URL in the HTML.
     Returns None if cannot resolve.
     """
+    key = normalize_url(url)
+    resolved = _RESOLVE_CACHE.get(key)
+    if resolved is None:
+        resolved = await _resolve_reddit_search_link(url)
+        if resolved:
+            _RESOLVE_CACHE.set(key, resolved)
+    return resolved
+
+
+async def _resolve_reddit_search_link(url: str) -> Optional[str]:
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                          "AppleWebKit/537.36 (KHTML, like Gecko) "
-                          "Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-        }
-
-        async with httpx.AsyncClient(timeout=15, follow_redirects=True) as client:
-            resp = await client.get(url, headers=headers)
-            if resp.status_code != 200:
-                print(f"DEBUG - Could not fetch search page: {resp.status_code}")
-                return None
-
-            soup = BeautifulSoup(resp.text, "html.parser")
-
-            # Try multiple selectors for finding the post link
-            selectors = [
-                'a[href*="/comments/"]',
-                'a[data-click-id="body"]',
-                'shreddit-post a[slot="full-post-link"]'
-            ]
-
-            for selector in selectors:
-                link = soup.select_one(selector)
-                if link and link.get("href"):
-                    href = link["href"]
-                    if href.startswith("/"):
-                        href = f"https://www.reddit.com{href}"
-                    print(f"DEBUG - Resolved /s/ link to: {href}")
-                    return href
+        resp = await get_reddit_client().get(url, headers=_BROWSER_HEADERS)
+        if resp.status_code != 200:
+            logger.debug("Could not fetch search page: %s", resp.status_code)
+            return None
+
+        soup = BeautifulSoup(resp.text, HTML_PARSER)
+
+        # Try multiple selectors for finding the post link
+        selectors = [
+            'a[href*="/comments/"]',
+            'a[data-click-id="body"]',
+            'shreddit-post a[slot="full-post-link"]'
+        ]
+
+        for selector in selectors:
+            link = soup.select_one(selector)
+            if link and link.get("href"):
+                href = link["href"]
+                if href.startswith("/"):
+                    href = f"https://www.reddit.com{href}"
+                logger.debug("Resolved /s/ link to: %s", href)
+                return href
 
     except Exception as e:
-        print(f"DEBUG - Error resolving search link: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.debug("Error resolving search link: %s", e, exc_info=True)
     return None
 
 
 def extract_reddit_post_id(url: str) -> Optional[str]:
     """Extract Reddit post ID from any /comments/... URL."""
-    match = re.search(r'/comments/([a-z0-9]+)', url)
+    match = _REDDIT_POST_ID_RE.search(url)
     if match:
         return match.group(1)
     return None
@@ -93,75 +132,90 @@ async def get_reddit_metadata(url: str) -> Tuple[
     Works for /comments/..., /s/... and redd.it short links.
     Returns: (title, subtitle, media_url, content, media_type)
     """
+    key = normalize_url(url)
+    hit = _METADATA_CACHE.get(key)
+    if hit is not None:
+        return hit
+
+    result = await _get_reddit_metadata(url)
+    if result[0]:
+        _METADATA_CACHE.set(key, result)
+    return result
+
+
+async def _get_reddit_metadata(url: str) -> Tuple[
+    Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]:
     try:
-        print(f"DEBUG - Processing Reddit URL: {url}")
+        logger.debug("Processing Reddit URL: %s", url)
 
         # Handle /s/... links by resolving to a canonical post
         if "/s/" in url:
-            print("DEBUG - Detected /s/ link, resolving...")
+            logger.debug("Detected /s/ link, resolving...")
             resolved = await resolve_reddit_search_link(url)
             if resolved:
                 url = resolved
             else:
-                print("DEBUG - Could not resolve /s/ link")
+                logger.debug("Could not resolve /s/ link")
                 return None, None, None, None, None
 
         # Handle redd.it short links by following redirects
         if 'redd.it' in url:
-            print("DEBUG - Detected redd.it short link, following redirect...")
-            async with httpx.AsyncClient(timeout=10, follow_redirects=True) as client:
-                resp = await client.head(url)
-                url = str(resp.url)
-                print(f"DEBUG - Redirected to: {url}")
+            logger.debug("Detected redd.it short link, following redirect...")
+            resp = await get_reddit_client().head(url, timeout=10)
+            url = str(resp.url)
+            logger.debug("Redirected to: %s", url)
 
         # Normalize the URL
         url = normalize_reddit_url(url)
 
         # Ensure we have a /comments/ URL
         if '/comments/' not in url:
-            print(f"DEBUG - URL doesn't contain /comments/: {url}")
+            logger.debug("URL doesn't contain /comments/: %s", url)
             return None, None, None, None, None
 
-        # Build JSON endpoint URL
-        json_url = url.rstrip("/") + ".json"
-        print(f"DEBUG - Fetching JSON from: {json_url}")
-
-        headers = {
-            "User-Agent": "Mozilla/5.0 (compatible; RedditExtractor/1.0)"
-        }
-
-        async with httpx.AsyncClient(timeout=15) as client:
-            resp = await client.get(json_url, headers=headers)
+        # Build JSON endpoint URL: the API host returns just the post plus one
+        # comment, and raw_json=1 leaves URLs unescaped (no &amp; fixups needed)
+        post_id = extract_reddit_post_id(url)
+        if post_id:
+            json_url = f"https://api.reddit.com/comments/{post_id}?limit=1&raw_json=1"
+        else:
+            json_url = url.rstrip("/") + ".json?raw_json=1"
+        logger.debug("Fetching JSON from: %s", json_url)
+
+        # The response is [post_listing, comments_listing]; stream-parse only the
+        # first element and stop reading before the comment tree
+        post_listing = None
+        async with get_reddit_client().stream("GET", json_url, headers=_JSON_HEADERS) as resp:
             if resp.status_code != 200:
-                print(f"DEBUG - Reddit JSON fetch failed: {resp.status_code}")
-                print(f"DEBUG - Response: {resp.text[:200]}")
+                await resp.aread()
+                logger.debug("Reddit JSON fetch failed: %s", resp.status_code)
+                logger.debug("Response: %.200s", resp.text)
                 return None, None, None, None, None
 
-            data = resp.json()
-            print(f"DEBUG - JSON response type: {type(data)}")
+            async for post_listing in ijson.items_async(_AsyncByteReader(resp.aiter_bytes()), "item", use_float=True):
+                break
 
         # Validate response structure
-        if not data or not isinstance(data, list) or len(data) == 0:
-            print(f"DEBUG - Invalid JSON structure: {type(data)}")
+        if not isinstance(post_listing, dict):
+            logger.debug("Invalid JSON structure: %s", type(post_listing))
             return None, None, None, None, None
 
         # Extract post data
         try:
-            post_listing = data[0]
             if 'data' not in post_listing or 'children' not in post_listing['data']:
-                print(f"DEBUG - Missing data/children in response")
+                logger.debug("Missing data/children in response")
                 return None, None, None, None, None
 
             children = post_listing['data']['children']
             if not children or len(children) == 0:
-                print(f"DEBUG - No children in post listing")
+                logger.debug("No children in post listing")
                 return None, None, None, None, None
 
             post_data = children[0]['data']
-            print(f"DEBUG - Successfully extracted post data")
+            logger.debug("Successfully extracted post data")
 
         except (KeyError, IndexError, TypeError) as e:
-            print(f"DEBUG - Error extracting post data: {e}")
+            logger.debug("Error extracting post data: %s", e)
             return None, None, None, None, None
 
         # Extract metadata
@@ -173,88 +227,88 @@ async def get_reddit_metadata(url: str) -> Tuple[
         media_url = None
         media_type = "image"
 
+        # Read the fields the media cascade branches on once
+        post_hint = post_data.get("post_hint")
+        is_gallery = post_data.get("is_gallery")
+        url_field = post_data.get("url")
+        preview = post_data.get("preview")
+        thumbnail = post_data.get("thumbnail")
+
         # Determine media URL and type
-        print(f"DEBUG - Post hint: {post_data.get('post_hint')}")
-        print(f"DEBUG - Is gallery: {post_data.get('is_gallery')}")
-        print(f"DEBUG - URL: {post_data.get('url')}")
+        logger.debug("Post hint: %s", post_hint)
+        logger.debug("Is gallery: %s", is_gallery)
+        logger.debug("URL: %s", url_field)
 
         # Check for hosted video
-        if post_data.get("is_video") or post_data.get("post_hint") == "hosted:video":
-            reddit_video = post_data.get("media", {}).get("reddit_video", {})
+        if post_data.get("is_video") or post_hint == "hosted:video":
+            reddit_video = (post_data.get("media") or {}).get("reddit_video") or {}
             media_url = reddit_video.get("fallback_url") or reddit_video.get("dash_url")
             media_type = "video"
-            print(f"DEBUG - Found hosted video: {media_url}")
+            logger.debug("Found hosted video: %s", media_url)
 
         # Check for image
-        elif post_data.get("post_hint") == "image":
-            media_url = post_data.get("url")
+        elif post_hint == "image":
+            media_url = url_field
             media_type = "image"
-            print(f"DEBUG - Found image: {media_url}")
+            logger.debug("Found image: %s", media_url)
 
         # Check for gallery
-        elif post_data.get("is_gallery"):
-            media_metadata = post_data.get("media_metadata", {})
-            gallery_data = post_data.get("gallery_data", {})
+        elif is_gallery:
+            media_metadata = post_data.get("media_metadata") or {}
 
             if media_metadata:
                 # Get first image from gallery
-                first_item_id = next(iter(media_metadata.keys()), None)
-                if first_item_id:
-                    first_item = media_metadata[first_item_id]
+                first_item = next(iter(media_metadata.values()), None)
+                if first_item:
                     # Try different sources for the image URL
+                    source = first_item.get("s") or {}
                     media_url = (
-                            first_item.get("s", {}).get("u") or
-                            first_item.get("s", {}).get("gif") or
-                            first_item.get("p", [{}])[-1].get("u")
+                            source.get("u") or
+                            source.get("gif") or
+                            (first_item.get("p") or [{}])[-1].get("u")
                     )
-                    if media_url:
-                        # Decode HTML entities in URL
-                        media_url = media_url.replace("&amp;", "&")
                     media_type = "image"
-                    print(f"DEBUG - Found gallery image: {media_url}")
+                    logger.debug("Found gallery image: %s", media_url)
 
         # Check for preview images
-        elif post_data.get("preview"):
-            images = post_data.get("preview", {}).get("images", [])
+        elif preview:
+            images = preview.get("images", [])
             if images:
                 source = images[0].get("source", {})
                 media_url = source.get("url")
-                if media_url:
-                    media_url = media_url.replace("&amp;", "&")
                 media_type = "image"
-                print(f"DEBUG - Found preview image: {media_url}")
+                logger.debug("Found preview image: %s", media_url)
 
         # Fallback to thumbnail
-        elif post_data.get("thumbnail") and post_data["thumbnail"].startswith("http"):
-            media_url = post_data["thumbnail"]
+        elif thumbnail and thumbnail.startswith("http"):
+            media_url = thumbnail
             media_type = "image"
-            print(f"DEBUG - Using thumbnail: {media_url}")
+            logger.debug("Using thumbnail: %s", media_url)
 
         # Check direct URL
-        elif post_data.get("url"):
-            url_str = post_data["url"]
+        elif url_field:
             # Check if it's an image or video
-            if any(url_str.endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp']):
-                media_url = url_str
+            if url_field.endswith(_IMG_EXTS):
+                media_url = url_field
                 media_type = "image"
-                print(f"DEBUG - Found direct image URL: {media_url}")
-            elif any(url_str.endswith(ext) for ext in ['.mp4', '.webm', '.mov']):
-                media_url = url_str
+                logger.debug("Found direct image URL: %s", media_url)
+            elif url_field.endswith(_VIDEO_EXTS):
+                media_url = url_field
                 media_type = "video"
-                print(f"DEBUG - Found direct video URL: {media_url}")
+                logger.debug("Found direct video URL: %s", media_url)
 
         # Use placeholder if no media found
         if not media_url or media_url == "self" or media_url == "default":
             media_url = DEFAULT_PLACEHOLDER
             media_type = "image"
-            print(f"DEBUG - Using placeholder image")
+            logger.debug("Using placeholder image")
 
-        print(
-            f"DEBUG - Final metadata: title={title[:50]}..., author={subtitle}, media={media_url}, content_len={len(content)}, type={media_type}")
+        logger.debug(
+            "Final metadata: title=%.50s..., author=%s, media=%s, content_len=%d, type=%s",
+            title, subtitle, media_url, len(content), media_type
+        )
         return title, subtitle, media_url, content, media_type
 
     except Exception as e:
-        print(f"Error in get_reddit_metadata: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_reddit_metadata: %s", e)
         return None, None, None, None, None
\ No newline at end of file
@@ -1,75 +1,135 @@
 # extractors/tiktok.py
 import re
-import json
+import logging
 from typing import Optional, Tuple
-from bs4 import BeautifulSoup
+import aiohttp
+import orjson
+from bs4 import BeautifulSoup, SoupStrainer
 
-from utils.http import http_get
-from extractors.base import get_meta_content
+from utils.http import cookie_session
+from extractors.base import get_meta_content, HTML_PARSER
+from utils import driver_pool
 from utils.selenium_utils import (
-    create_driver,
-    quit_driver,
+    USER_AGENT,
     load_tiktok_page,
-    extract_tiktok_media
+    extract_tiktok_media,
+    extract_tiktok_json_from_html,
+    choose_best_media_from_json,
+    fetch_url_with_session,
 )
 from utils.normalize import normalize_title, normalize_subtitle
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_PLACEHOLDER = "https://dummyimage.com/600x400/e0e0e0/555.png&text=No+Image"
 
+_TIKTOK_ID_RES = [re.compile(p) for p in (
+    r'tiktok\.com/@[^/]+/video/(\d+)',
+    r'tiktok\.com/v/(\d+)',
+    r'vm\.tiktok\.com/([A-Za-z0-9]+)',
+)]
+_TIKTOK_USERNAME_RE = re.compile(r'tiktok\.com/@([^/]+)')
+_SIGI_RE = re.compile(r'<script id="SIGI_STATE"[^>]*>(.*?)</script>', re.DOTALL)
+_META_ONLY = SoupStrainer("meta")
+_PAGE_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Referer": "https://www.tiktok.com/",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+}
+
 
 def extract_tiktok_id(url: str) -> Optional[str]:
     """Extract TikTok video ID from various URL formats."""
-    patterns = [
-        r'tiktok\.com/@[^/]+/video/(\d+)',
-        r'tiktok\.com/v/(\d+)',
-        r'vm\.tiktok\.com/([A-Za-z0-9]+)',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, url)
+    for pattern in _TIKTOK_ID_RES:
+        match = pattern.search(url)
         if match:
             return match.group(1)
     return None
 
 
+async def fetch_tiktok_page(url: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Fetch the TikTok page without a browser and pick the media from its embedded JSON.
+    The media URL is HEAD-checked with the cookies the page set.
+    Returns (page_source, media_url, media_type), or (None, None, None) when a real browser
+    is needed (captcha, age gate, no JSON, or the media URL is refused).
+    """
+    try:
+        async with cookie_session(aiohttp.CookieJar(), headers=_PAGE_HEADERS) as session:
+            async with session.get(url) as resp:
+                if resp.status != 200:
+                    logger.debug("TikTok page GET returned %s", resp.status)
+                    return None, None, None
+                html = await resp.text()
+
+            media_url, _, media_type = choose_best_media_from_json(extract_tiktok_json_from_html(html))
+            if not media_url:
+                logger.debug("No TikTok JSON media in plain HTML")
+                return None, None, None
+
+            status, final = await fetch_url_with_session(session, media_url)
+            if not status or status >= 400:
+                logger.debug("TikTok media HEAD without browser returned %s", status)
+                return None, None, None
+            return html, final or media_url, media_type
+    except Exception as e:
+        logger.debug("TikTok page GET failed: %s", e)
+        return None, None, None
+
+
 async def get_tiktok_metadata(url: str) -> Tuple[
     Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]:
     """
     Extract title, subtitle, media URL, content, and media type from a TikTok URL.
+    The page is fetched over plain HTTP first; Selenium is only started when that
+    needs a real browser.
     Returns (title, subtitle, media_url, content, media_type)
     """
-    print(f"DEBUG - get_tiktok_metadata called with: {url}")
+    logger.debug("get_tiktok_metadata called with: %s", url)
 
     driver = None
     try:
         video_id = extract_tiktok_id(url)
         if video_id:
-            print(f"DEBUG - TikTok video ID: {video_id}")
+            logger.debug("TikTok video ID: %s", video_id)
         else:
-            print(f"DEBUG - Could not extract video ID from: {url}")
+            logger.debug("Could not extract video ID from: %s", url)
 
-        # Create driver for Selenium extraction
-        driver = await create_driver()
+        # Plain HTTP first; most pages ship the same JSON to a browser-less GET
+        page_source, media_url, media_type = await fetch_tiktok_page(url)
 
-        # Load page with Selenium
-        page_source = await load_tiktok_page(driver, url)
-        soup = BeautifulSoup(page_source, 'html.parser')
+        if page_source is None:
+            # Borrow a warm driver from the pool
+            driver = await driver_pool.acquire()
+
+            # Load page with Selenium
+            page_source = await load_tiktok_page(driver, url)
+
+            # ============ EXTRACT MEDIA WITH SELENIUM ============
+            # Reuse the page source we already have instead of fetching it again
+            media_url, media_type = await extract_tiktok_media(driver, page_source)
+
+        # Only <meta> tags are read here, so skip building the (very large) body tree,
+        # and only parse at all if a meta-tag fallback actually needs it
+        soup = None
+
+        def page_meta(prop: str, attr: str = "property") -> Optional[str]:
+            nonlocal soup
+            if soup is None:
+                soup = BeautifulSoup(page_source, HTML_PARSER, parse_only=_META_ONLY)
+            return get_meta_content(soup, prop, attr=attr)
 
         # Initialize variables
-        media_url = None
-        media_type = "video"
         title = None
         subtitle = None
         content = None
 
-        # ============ EXTRACT MEDIA WITH SELENIUM ============
-        media_url, media_type = await extract_tiktok_media(driver)
-
         # ============ EXTRACT METADATA FROM PAGE SOURCE ============
         # Try to parse SIGI_STATE JSON for reliable data
-        script_tag = soup.find("script", id="SIGI_STATE")
-        if script_tag:
+        sigi_match = _SIGI_RE.search(page_source)
+        if sigi_match:
             try:
-                data = json.loads(script_tag.string)
+                data = orjson.loads(sigi_match.group(1))
 
                 # Navigate through the nested structure
                 item_module = data.get("ItemModule", {})
@@ -90,63 +150,56 @@ async def get_tiktok_metadata(url: str) -> Tuple[
                     # Content: same as title
                     content = title
 
-                    print(f"DEBUG - Extracted from SIGI_STATE: title={title[:50]}, subtitle={subtitle}")
+                    logger.debug("Extracted from SIGI_STATE: title=%.50s, subtitle=%s", title, subtitle)
 
             except Exception as e:
-                print(f"DEBUG - Failed SIGI_STATE parsing: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.debug("Failed SIGI_STATE parsing: %s", e, exc_info=True)
 
         # Fallback: use meta tags if JSON fails
         if not title:
             title = normalize_title(
-                get_meta_content(soup, 'og:title') or
-                get_meta_content(soup, 'twitter:title', attr='name') or
+                page_meta('og:title') or
+                page_meta('twitter:title', attr='name') or
                 "TikTok Video"
             )
 
         if not subtitle:
             # Try to extract username from URL
-            username_match = re.search(r'tiktok\.com/@([^/]+)', url)
+            username_match = _TIKTOK_USERNAME_RE.search(url)
             if username_match:
                 subtitle = normalize_subtitle(f"@{username_match.group(1)}")
             else:
                 subtitle = normalize_subtitle(
-                    get_meta_content(soup, 'og:site_name') or "TikTok"
+                    page_meta('og:site_name') or "TikTok"
                 )
 
         if not content:
-            content = get_meta_content(soup, 'og:description') or title
+            content = page_meta('og:description') or title
 
         # If Selenium didn't find media, try meta tags
         if not media_url or media_url == DEFAULT_PLACEHOLDER:
-            print(f"DEBUG - Falling back to meta tag extraction for media")
+            logger.debug("Falling back to meta tag extraction for media")
 
             # Try og:image for cover
-            cover_url = get_meta_content(soup, 'og:image')
+            cover_url = page_meta('og:image')
             if cover_url:
-                print(f"DEBUG - Found og:image: {cover_url[:100]}")
+                logger.debug("Found og:image: %.100s", cover_url)
                 media_url = cover_url
             else:
+                logger.debug("No media URL found, using placeholder")
                 media_url = DEFAULT_PLACEHOLDER
 
-        # Use placeholder if still nothing found
-        if not media_url:
-            print(f"DEBUG - No media URL found, using placeholder")
-            media_url = DEFAULT_PLACEHOLDER
-
-        print(f"DEBUG - FINAL: title={title[:50]}, subtitle={subtitle}, media_type={media_type}")
-        print(f"DEBUG - FINAL: media_url={media_url[:100] if media_url else None}")
+        logger.debug("FINAL: title=%.50s, subtitle=%s, media_type=%s", title, subtitle, media_type)
+        logger.debug("FINAL: media_url=%.100s", media_url)
 
         return title, subtitle, media_url, content, media_type
 
     except Exception as e:
-        print(f"ERROR in get_tiktok_metadata: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_tiktok_metadata: %s", e)
         return None, None, DEFAULT_PLACEHOLDER, url, "video"
 
     finally:
-        # Clean up driver
+        # Return driver to the pool
         if driver:
-            await quit_driver(driver)
\ No newline at end of file
+            await driver_pool.release(driver)
+
@@ -1,14 +1,22 @@
 import re
 import os
+import asyncio
 import hashlib
+import logging
+import orjson
+import aiofiles.os
+from functools import lru_cache
 from typing import Optional, Dict, Tuple
 from bs4 import BeautifulSoup
 
-from utils.http import http_get
+from utils.http import http_get, http_stream
 from utils.text import extract_urls_from_text
 from extractors.base import get_meta_content
+from extractors.cache import TTLCache
 from utils.normalize import normalize_title, normalize_subtitle
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_PLACEHOLDER = "https://dummyimage.com/600x400/e0e0e0/555.png&text=No+Image"
 
 # Configure your video storage paths
@@ -17,6 +25,25 @@ VIDEO_URL_PREFIX = "/videos"  # URL path to access videos
 THUMBNAIL_STORAGE_DIR = "/path/to/public/videos/thumbnails"  # Change this to your actual path
 THUMBNAIL_URL_PREFIX = "/videos/thumbnails"
 
+_TWEET_ID_RE = re.compile(r"/status/(\d+)")
+_URL_STRIP_RE = re.compile(r'https?://\S+')
+_VIDEO_EXTS = ('.mp4', '.webm', '.mov', '.avi', '.mkv', '.m4v', '.gif')
+_VIDEO_MARKERS = ('video.twimg.com', '/amplify_video/', '/ext_tw_video/', '.mp4', '.webm')
+
+# Re-posted tweets are common; keep fxtwitter responses for 10 minutes and
+# remember failed lookups briefly so a broken tweet doesn't re-hit the API
+_TWEET_CACHE = TTLCache(ttl=600, maxsize=1024)
+_TWEET_MISS_TTL = 60
+_MISS = object()
+_TWEET_INFLIGHT: Dict[str, "asyncio.Future"] = {}
+
+# Remote video URL -> public path of the downloaded copy, so repeats skip the
+# hash, mkdir and stat; failed downloads are retried after a minute
+_VIDEO_URL_CACHE = TTLCache(ttl=86400, maxsize=2048)
+_VIDEO_INFLIGHT: Dict[str, "asyncio.Future"] = {}
+# Filenames already in VIDEO_STORAGE_DIR; listed once on first use, then kept in sync
+_known_videos: Optional[set] = None
+
 
 # ---------- Video Download utilities ----------
 
@@ -24,11 +51,37 @@ async def download_video(video_url: str) -> Optional[str]:
     """
     Download a video file. Returns video_path as URL, or None if failed.
     """
+    cached = _VIDEO_URL_CACHE.get(video_url)
+    if cached is not None:
+        return None if cached is _MISS else cached
+
+    # Same tweet archived from two messages at once: download the file only once
+    pending = _VIDEO_INFLIGHT.get(video_url)
+    if pending is None:
+        pending = asyncio.ensure_future(_download_and_cache_video(video_url))
+        _VIDEO_INFLIGHT[video_url] = pending
+        pending.add_done_callback(lambda _: _VIDEO_INFLIGHT.pop(video_url, None))
+    return await asyncio.shield(pending)
+
+
+async def _download_and_cache_video(video_url: str) -> Optional[str]:
+    video_path = await _download_video(video_url)
+    if video_path is None:
+        _VIDEO_URL_CACHE.set(video_url, _MISS, ttl=_TWEET_MISS_TTL)
+    else:
+        _VIDEO_URL_CACHE.set(video_url, video_path)
+    return video_path
+
+
+async def _download_video(video_url: str) -> Optional[str]:
+    global _known_videos
     try:
-        os.makedirs(VIDEO_STORAGE_DIR, exist_ok=True)
+        if _known_videos is None:
+            await aiofiles.os.makedirs(VIDEO_STORAGE_DIR, exist_ok=True)
+            _known_videos = set(await aiofiles.os.listdir(VIDEO_STORAGE_DIR))
 
         # Generate unique filename
-        url_hash = hashlib.md5(video_url.encode()).hexdigest()[:12]
+        url_hash = hashlib.blake2b(video_url.encode(), digest_size=6).hexdigest()
         extension = '.mp4'
         if video_url.lower().endswith('.webm'):
             extension = '.webm'
@@ -38,63 +91,107 @@ async def download_video(video_url: str) -> Optional[str]:
         video_filename = f"twitter_{url_hash}{extension}"
         video_filepath = os.path.join(VIDEO_STORAGE_DIR, video_filename)
 
-        if os.path.exists(video_filepath):
+        if video_filename in _known_videos:
             return f"{VIDEO_URL_PREFIX}/{video_filename}"
 
         # Download video
-        print(f"Downloading video from: {video_url}")
+        logger.debug("Downloading video from: %s", video_url)
         headers = {'User-Agent': 'Mozilla/5.0'}
-        resp = await http_get(video_url, headers=headers, timeout=30)
+        status = await http_stream(video_url, video_filepath, headers=headers, timeout=30)
 
-        if not resp or resp.status_code != 200:
-            print(f"Failed to download video: {resp.status_code if resp else 'No response'}")
+        if status != 200:
+            logger.warning("Failed to download video: %s", status or "No response")
             return None
 
-        with open(video_filepath, 'wb') as f:
-            f.write(resp.content)
-
-        print(f"Video downloaded successfully: {video_filepath}")
+        _known_videos.add(video_filename)
+        logger.debug("Video downloaded successfully: %s", video_filepath)
         return f"{VIDEO_URL_PREFIX}/{video_filename}"
 
     except Exception as e:
-        print(f"Error downloading video: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error downloading video: %s", e)
         return None
 
 
 # ---------- Twitter/X utilities ----------
 
 async def get_tweet_data(tweet_id: str) -> Optional[Dict]:
+    cached = _TWEET_CACHE.get(tweet_id)
+    if cached is not None:
+        return None if cached is _MISS else cached
+
+    # The media and link paths often resolve the same tweet at the same time;
+    # share one in-flight request between them. shield() keeps a cancelled
+    # waiter (e.g. a losing media probe) from cancelling the shared fetch.
+    pending = _TWEET_INFLIGHT.get(tweet_id)
+    if pending is None:
+        pending = asyncio.ensure_future(_fetch_and_cache_tweet(tweet_id))
+        _TWEET_INFLIGHT[tweet_id] = pending
+        pending.add_done_callback(lambda _: _TWEET_INFLIGHT.pop(tweet_id, None))
+    return await asyncio.shield(pending)
+
+
+async def _fetch_and_cache_tweet(tweet_id: str) -> Optional[Dict]:
+    tweet = await _get_tweet_data(tweet_id)
+    if tweet is None:
+        _TWEET_CACHE.set(tweet_id, _MISS, ttl=_TWEET_MISS_TTL)
+    else:
+        _TWEET_CACHE.set(tweet_id, tweet)
+    return tweet
+
+
+async def _get_tweet_data(tweet_id: str) -> Optional[Dict]:
     try:
         resp = await http_get(f"https://api.fxtwitter.com/status/{tweet_id}", timeout=5)
         if resp and resp.status_code == 200:
-            data = resp.json()
+            data = orjson.loads(resp.content)
             if isinstance(data, dict) and "tweet" in data:
                 return data.get("tweet")
     except Exception as e:
-        print(f"Error fetching tweet {tweet_id}: {e}")
+        logger.warning("Error fetching tweet %s: %s", tweet_id, e)
     return None
 
 
+@lru_cache(maxsize=4096)
 def extract_tweet_id(url: str) -> Optional[str]:
-    match = re.search(r"/status/(\d+)", url)
+    match = _TWEET_ID_RE.search(url)
     if match:
         return match.group(1)
     return None
 
 
+@lru_cache(maxsize=4096)
 def is_video_url(url: str) -> bool:
     if not url:
         return False
 
-    video_extensions = ('.mp4', '.webm', '.mov', '.avi', '.mkv', '.m4v', '.gif')
     url_lower = url.lower()
-    if any(url_lower.endswith(ext) for ext in video_extensions):
-        return True
+    return url_lower.endswith(_VIDEO_EXTS) or any(m in url_lower for m in _VIDEO_MARKERS)
 
-    video_patterns = [r'video\.twimg\.com', r'/amplify_video/', r'/ext_tw_video/', r'\.mp4', r'\.webm']
-    return any(re.search(pattern, url_lower) for pattern in video_patterns)
+
+def _pick_media(media_obj) -> Tuple[Optional[str], Optional[str]]:
+    """
+    First video and first photo URL of an fxtwitter `media` field, in one pass.
+    Handles both the {"videos": [...], "photos": [...]} and the flat list shapes.
+    """
+    if isinstance(media_obj, dict):
+        videos = media_obj.get("videos") or []
+        photos = media_obj.get("photos") or []
+        return (
+            videos[0].get("url") if videos else None,
+            photos[0].get("url") if photos else None,
+        )
+
+    video_url = photo_url = None
+    if isinstance(media_obj, list):
+        for m in media_obj:
+            m_type = m.get("type")
+            if video_url is None and m_type in ("video", "gif"):
+                video_url = m.get("url")
+            elif photo_url is None and m_type in ("photo", "image"):
+                photo_url = m.get("url")
+            if video_url and photo_url:
+                break
+    return video_url, photo_url
 
 
 async def get_twitter_metadata(url: str) -> Tuple[
@@ -113,7 +210,7 @@ async def get_twitter_metadata(url: str) -> Tuple[
             return None, None, None, None, None
 
         full_text = tweet_data.get("text", "")
-        title = re.sub(r'https?://\S+', '', full_text).strip()
+        title = _URL_STRIP_RE.sub('', full_text).strip()
         title = normalize_title(title or None)
 
         author = tweet_data.get("author")
@@ -123,32 +220,13 @@ async def get_twitter_metadata(url: str) -> Tuple[
         media_url = None
         media_type = None
 
-        media_obj = tweet_data.get("media")
-        if isinstance(media_obj, dict):
-            videos = media_obj.get("videos", [])
-            if videos:
-                remote_video_url = videos[0].get("url")
-                if remote_video_url:
-                    media_url = await download_video(remote_video_url)
-                    media_type = "video" if media_url else None
-            if not media_url:
-                photos = media_obj.get("photos", [])
-                if photos:
-                    media_url = photos[0].get("url")
-                    media_type = "image" if media_url else None
-        elif isinstance(media_obj, list):
-            for m in media_obj:
-                m_type = m.get("type")
-                if m_type in ("video", "gif"):
-                    remote_video_url = m.get("url")
-                    if remote_video_url:
-                        media_url = await download_video(remote_video_url)
-                        media_type = "video" if media_url else None
-                        break
-                elif m_type in ("photo", "image"):
-                    media_url = m.get("url")
-                    media_type = "image" if media_url else None
-                    break
+        video_url, photo_url = _pick_media(tweet_data.get("media"))
+        if video_url:
+            media_url = await download_video(video_url)
+            media_type = "video" if media_url else None
+        if not media_url and photo_url:
+            media_url = photo_url
+            media_type = "image"
 
         # Fallback to placeholder
         if not media_url:
@@ -158,7 +236,5 @@ async def get_twitter_metadata(url: str) -> Tuple[
         return title, subtitle, media_url, content, media_type
 
     except Exception as e:
-        print(f"Error in get_twitter_metadata: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in get_twitter_metadata: %s", e)
         return None, None, None, None, None
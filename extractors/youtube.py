@@ -1,30 +1,32 @@
 import re
+import logging
 from typing import Optional, Tuple
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 
 from utils.http import http_get
-from extractors.base import get_meta_content
+from extractors.base import collect_tree_meta_contents
+from extractors.cache import TTLCache
 from utils.normalize import normalize_title, normalize_subtitle
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_PLACEHOLDER = "https://dummyimage.com/600x400/e0e0e0/555.png&text=No+Image"
 
+_YOUTUBE_ID_RE = re.compile(r'(?:youtube\.com/(?:watch\?v=|embed/|v/|shorts/)|youtu\.be/)([A-Za-z0-9_-]{11})')
+_TITLE_SUFFIX_RE = re.compile(r'\s*-\s*YouTube\s*$')
+_AUTHOR_RE = re.compile(rb'"author":\s*"([^"]+)"')
+
+# Same video linked again (any URL form) within an hour skips the page fetch
+_METADATA_CACHE = TTLCache(ttl=3600, maxsize=1024)
+
 
 # ---------- YouTube utilities ----------
 
 def extract_youtube_id(url: str) -> Optional[str]:
     """Extract YouTube video ID from various URL formats."""
-    patterns = [
-        r'(?:youtube\.com/watch\?v=|youtu\.be/)([A-Za-z0-9_-]{11})',
-        r'youtube\.com/embed/([A-Za-z0-9_-]{11})',
-        r'youtube\.com/v/([A-Za-z0-9_-]{11})',
-        r'youtube\.com/shorts/([A-Za-z0-9_-]{11})',
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    return None
+    match = _YOUTUBE_ID_RE.search(url)
+    return match.group(1) if match else None
 
 
 def get_youtube_thumbnail(video_id: str, quality: str = "maxresdefault") -> str:
@@ -39,20 +41,36 @@ async def get_youtube_metadata(url: str) -> Tuple[
     Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]:
     """
     Extract title, subtitle, media URL, content, and media type from a YouTube URL.
+    Results from a successful page fetch are cached per video ID.
     Returns (title, subtitle, media_url, content, media_type)
     """
+    video_id = extract_youtube_id(url)
+    if video_id:
+        hit = _METADATA_CACHE.get(video_id)
+        if hit is not None:
+            return hit
+
+    result = await _get_youtube_metadata(url)
+    # A title equal to the bare ID means the page fetch failed; retry next time
+    if video_id and result[0] and result[0] != video_id:
+        _METADATA_CACHE.set(video_id, result)
+    return result
+
+
+async def _get_youtube_metadata(url: str) -> Tuple[
+    Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]:
     try:
         video_id = extract_youtube_id(url)
         if not video_id:
-            print(f"DEBUG - Could not extract YouTube video ID from: {url}")
+            logger.debug("Could not extract YouTube video ID from: %s", url)
             return None, None, None, None, None
 
-        print(f"DEBUG - Extracted YouTube video ID: {video_id}")
+        logger.debug("Extracted YouTube video ID: %s", video_id)
 
         # ✅ CHANGE THIS LINE - Use embed URL instead of thumbnail
         media_url = f"https://www.youtube.com/embed/{video_id}"
         media_type = "youtube"  # Keep as YOUTUBE video
-        print(f"DEBUG - YouTube embed URL: {media_url}")
+        logger.debug("YouTube embed URL: %s", media_url)
 
         # Fetch page metadata
         headers = {
@@ -61,60 +79,61 @@ async def get_youtube_metadata(url: str) -> Tuple[
         resp = await http_get(url, headers=headers, timeout=10)
 
         if not resp or resp.status_code != 200:
-            print(f"DEBUG - YouTube fetch failed, using embed URL anyway")
+            logger.debug("YouTube fetch failed, using embed URL anyway")
             # Return with embed URL
             return video_id, "YouTube", media_url, url, media_type
 
-        soup = BeautifulSoup(resp.content, 'html.parser')
+        try:
+            tree = lxml.html.fromstring(resp.content)
+        except (etree.ParserError, ValueError):
+            return video_id, "YouTube", media_url, url, media_type
+        metas = collect_tree_meta_contents(tree)
 
         # Title: Try multiple sources
         title = (
-                get_meta_content(soup, 'og:title')
-                or get_meta_content(soup, 'twitter:title', attr='name')
-                or get_meta_content(soup, 'name', attr='name')
-                or (soup.title.string.strip() if soup.title and soup.title.string else None)
+                metas.get(('property', 'og:title'))
+                or metas.get(('name', 'twitter:title'))
+                or metas.get(('name', 'name'))
+                or (tree.findtext('.//title') or '').strip() or None
         )
 
         # Clean up title
         if title:
-            title = re.sub(r'\s*-\s*YouTube\s*$', '', title)
+            title = _TITLE_SUFFIX_RE.sub('', title)
 
         title = normalize_title(title or video_id)
 
         # Subtitle: Channel name
         subtitle = (
-                get_meta_content(soup, 'og:site_name')
-                or get_meta_content(soup, 'author', attr='name')
+                metas.get(('property', 'og:site_name'))
+                or metas.get(('name', 'author'))
         )
 
         if not subtitle:
-            try:
-                script_tag = soup.find("script", string=re.compile(r'"author"'))
-                if script_tag:
-                    match = re.search(r'"author":\s*"([^"]+)"', script_tag.string)
-                    if match:
-                        subtitle = match.group(1)
-            except:
-                pass
+            # Scan the raw page bytes for the embedded player JSON instead of
+            # walking every <script> tag in the tree
+            match = _AUTHOR_RE.search(resp.content)
+            if match:
+                subtitle = match.group(1).decode("utf-8", "replace")
 
         subtitle = normalize_subtitle(subtitle or "YouTube")
 
         # Content: Description
         content = (
-                get_meta_content(soup, 'og:description')
-                or get_meta_content(soup, 'description', attr='name')
-                or get_meta_content(soup, 'twitter:description', attr='name')
+                metas.get(('property', 'og:description'))
+                or metas.get(('name', 'description'))
+                or metas.get(('name', 'twitter:description'))
         )
 
         if not content or not content.strip():
             content = title
 
-        print(f"DEBUG - YouTube: title={title}, embed={media_url}")
+        logger.debug("YouTube: title=%s, embed=%s", title, media_url)
 
         return title, subtitle, media_url, content, media_type
 
     except Exception as e:
-        print(f"Error in get_youtube_metadata: {e}")
+        logger.exception("Error in get_youtube_metadata: %s", e)
         # ✅ Even on error, try to return embed URL if we have video_id
         video_id = extract_youtube_id(url)
         if video_id:
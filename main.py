@@ -1,15 +1,50 @@
 import os
+import logging
 import discord
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from discord.ext import commands
 from dotenv import load_dotenv
 
+from utils import driver_pool
+from utils.http import get_session, close_session
+
 load_dotenv()
 TOKEN = os.getenv("TOKEN")
 
+# Extractor debug output is only formatted when LOG_LEVEL=DEBUG
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+
+# Selenium work runs via asyncio.to_thread and mostly sits in blocking waits, so size
+# the pool for concurrent page loads rather than CPU count (the stdlib default)
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "32"))
+
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+
+class ArchiveBot(commands.Bot):
+    async def setup_hook(self):
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE, thread_name_prefix="blocking-io")
+        )
+        # One pooled HTTP session for the bot's lifetime, shared by all cogs
+        self.http_session = get_session()
+        # Start the Selenium drivers in the background so login isn't held up by Chrome startup
+        self._driver_warmup = asyncio.create_task(driver_pool.warm())
+
+    async def close(self):
+        await super().close()
+        await close_session()
+        self._driver_warmup.cancel()
+        await asyncio.gather(self._driver_warmup, return_exceptions=True)
+        await driver_pool.close_all()
+
+
+bot = ArchiveBot(command_prefix="!", intents=intents)
 
 # Guild ID for testing (slash commands)
 GUILD_ID = os.getenv("GUILD_ID")
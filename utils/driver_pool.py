@@ -0,0 +1,155 @@
+# utils/driver_pool.py
+import os
+import asyncio
+import logging
+from typing import Optional
+
+from utils.selenium_utils import create_driver, close_selenium_session
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.getenv("SELENIUM_POOL_SIZE", "2"))
+
+# Idle drivers plus a count of started ones; waiters are woken whenever a driver
+# comes back or a slot frees up so they can start a replacement
+_idle: list = []
+_created = 0
+# Checked-out drivers, so shutdown can quit the ones still in use
+_in_use: set = set()
+_cond: Optional[asyncio.Condition] = None
+
+
+def _get_cond() -> asyncio.Condition:
+    global _cond
+    if _cond is None:
+        _cond = asyncio.Condition()
+    return _cond
+
+
+async def _put_idle(driver):
+    cond = _get_cond()
+    async with cond:
+        _idle.append(driver)
+        cond.notify()
+
+
+async def _free_slot():
+    global _created
+    cond = _get_cond()
+    async with cond:
+        _created -= 1
+        cond.notify()
+
+
+async def _discard(driver):
+    await close_selenium_session(driver)
+    await asyncio.to_thread(_quit_sync, driver)
+    await _free_slot()
+
+
+def _is_alive_sync(driver) -> bool:
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+def _reset_sync(driver):
+    driver.delete_all_cookies()
+    driver.get("about:blank")
+
+
+def _quit_sync(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.debug("Error closing driver: %s", e)
+
+
+async def acquire():
+    """
+    Get a Chromium driver from the pool.
+    Reuses an idle driver when one is healthy, starts a new one while under
+    POOL_SIZE, otherwise waits for another extraction to release one.
+    """
+    global _created
+    cond = _get_cond()
+    while True:
+        async with cond:
+            while not _idle and _created >= POOL_SIZE:
+                await cond.wait()
+            driver = _idle.pop() if _idle else None
+            if driver is None:
+                _created += 1
+
+        if driver is None:
+            try:
+                driver = await create_driver()
+            except BaseException:
+                await _free_slot()
+                raise
+            _in_use.add(driver)
+            return driver
+
+        if await asyncio.to_thread(_is_alive_sync, driver):
+            _in_use.add(driver)
+            return driver
+        # Dead browser: drop it and let the loop start a replacement
+        await _discard(driver)
+
+
+async def _start_idle():
+    try:
+        driver = await create_driver()
+    except Exception as e:
+        logger.warning("Could not pre-start driver: %s", e)
+        await _free_slot()
+        return
+    except asyncio.CancelledError:
+        await _free_slot()
+        raise
+    await _put_idle(driver)
+
+
+async def warm():
+    """
+    Start drivers up to POOL_SIZE ahead of time so the first extractions
+    don't pay Chrome startup; call once the event loop is running.
+    Slots are reserved up front; a failed start frees its slot and wakes any
+    acquire() already waiting on it.
+    """
+    global _created
+    missing = POOL_SIZE - _created
+    if missing <= 0:
+        return
+    _created += missing
+    await asyncio.gather(*(_start_idle() for _ in range(missing)))
+
+
+async def release(driver):
+    """Reset a driver (cookies, current page) and return it to the pool."""
+    if driver not in _in_use:
+        # Already quit by close_all() during shutdown
+        return
+    _in_use.discard(driver)
+    try:
+        await asyncio.to_thread(_reset_sync, driver)
+    except Exception as e:
+        logger.debug("Recycling driver after reset failure: %s", e)
+        # Frees the slot and wakes a waiter so it starts a replacement
+        await _discard(driver)
+        return
+    await _put_idle(driver)
+
+
+async def close_all():
+    """Quit every idle and checked-out driver; call on bot shutdown."""
+    global _created
+    drivers = _idle + list(_in_use)
+    _idle.clear()
+    _in_use.clear()
+    for driver in drivers:
+        await close_selenium_session(driver)
+        await asyncio.to_thread(_quit_sync, driver)
+        _created -= 1
@@ -1,15 +1,126 @@
-import asyncio
-import requests
-from typing import Optional
+import logging
+import aiofiles
+import aiofiles.os
+import aiohttp
+import httpx
+import orjson
+from typing import Any, Optional
 
-def blocking_get(url: str, headers: dict = None, timeout: int = 10) -> requests.Response:
-    return requests.get(url, headers=headers or {}, timeout=timeout)
+logger = logging.getLogger(__name__)
 
+_session: Optional[aiohttp.ClientSession] = None
+_reddit_client: Optional[httpx.AsyncClient] = None
 
-async def http_get(url: str, headers: dict = None, timeout: int = 10) -> Optional[requests.Response]:
+
+def get_session() -> aiohttp.ClientSession:
+    """Return the shared pooled aiohttp session, creating it on first use."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=100, limit_per_host=20, keepalive_timeout=60, ttl_dns_cache=300
+            ),
+            timeout=aiohttp.ClientTimeout(total=15),
+        )
+    return _session
+
+
+def cookie_session(cookie_jar: aiohttp.CookieJar, headers: Optional[dict] = None) -> aiohttp.ClientSession:
+    """
+    A session with its own cookie jar and default headers that borrows the shared
+    session's connection pool. Closing it leaves the pool (and its keep-alive
+    connections) open.
+    """
+    return aiohttp.ClientSession(
+        connector=get_session().connector,
+        connector_owner=False,
+        cookie_jar=cookie_jar,
+        headers=headers,
+        timeout=aiohttp.ClientTimeout(total=15),
+    )
+
+
+def get_reddit_client() -> httpx.AsyncClient:
+    """Return the shared httpx client used for Reddit, creating it on first use."""
+    global _reddit_client
+    if _reddit_client is None or _reddit_client.is_closed:
+        # HTTP/2 lets the /s/ resolve and the JSON fetch share one multiplexed connection
+        _reddit_client = httpx.AsyncClient(
+            http2=True,
+            timeout=15,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _reddit_client
+
+
+async def close_session():
+    """Close the shared HTTP clients if they were opened."""
+    global _session, _reddit_client
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    if _reddit_client is not None and not _reddit_client.is_closed:
+        await _reddit_client.aclose()
+    _reddit_client = None
+
+
+class HTTPResponse:
+    """Fully-read response returned by `http_get`, with a requests-like surface."""
+
+    __slots__ = ("url", "status_code", "headers", "content", "encoding")
+
+    def __init__(self, url: str, status_code: int, headers, content: bytes, encoding: Optional[str]):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self) -> Any:
+        return orjson.loads(self.content)
+
+
+async def http_get(url: str, headers: dict = None, timeout: int = 10) -> Optional[HTTPResponse]:
+    """GET `url` over the shared pooled session; returns None on network errors."""
+    try:
+        async with get_session().get(
+            url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as resp:
+            content = await resp.read()
+            return HTTPResponse(str(resp.url), resp.status, resp.headers, content, resp.charset)
+    except Exception as e:
+        logger.warning("HTTP GET error for %s: %s", url, e)
+        return None
+
+
+async def http_stream(url: str, dest: str, headers: dict = None, timeout: int = 30,
+                      chunk_size: int = 64 * 1024) -> Optional[int]:
+    """
+    Stream a 200 response body to `dest` in fixed-size chunks.
+    The body is written to a temporary file and renamed into place, so a partial
+    download never appears at `dest`. Returns the HTTP status, or None on errors.
+    """
+    tmp = f"{dest}.part"
     try:
-        resp = await asyncio.to_thread(blocking_get, url, headers or {}, timeout)
-        return resp
+        async with get_session().get(
+            url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as resp:
+            if resp.status != 200:
+                return resp.status
+            async with aiofiles.open(tmp, "wb") as f:
+                async for chunk in resp.content.iter_chunked(chunk_size):
+                    await f.write(chunk)
+        await aiofiles.os.replace(tmp, dest)
+        return 200
     except Exception as e:
-        print(f"HTTP GET error for {url}: {e}")
-        return None
\ No newline at end of file
+        logger.warning("HTTP stream error for %s: %s", url, e)
+        try:
+            await aiofiles.os.remove(tmp)
+        except OSError:
+            pass
+        return None
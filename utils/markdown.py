@@ -1,6 +1,31 @@
 import re
 from typing import Tuple, Optional
 
+_HEADING_RE = re.compile(r'^(#{1,3})\s+(.+)$')
+_SUBTEXT_RE = re.compile(r'^-#\s+')
+
+_CODE_BLOCK_RE = re.compile(r'```([\s\S]*?)```')
+_INLINE_CODE_RE = re.compile(r'`([^`]+?)`')
+_SPOILER_RE = re.compile(r'\|\|(.+?)\|\|', re.DOTALL)
+_STRIKE_RE = re.compile(r'~~(.+?)~~', re.DOTALL)
+_MASKED_LINK_RE = re.compile(r'\[([^\]]+?)\]\([^\)]+?\)')
+# Every emphasis format in one alternation; each branch has exactly one group
+# holding the inner text, so m.lastindex says which branch matched
+_EMPHASIS_RE = re.compile(
+    r'\*\*\*(.+?)\*\*\*'                   # 1: bold + italic
+    r'|___(.+?)___'                         # 2: underline + italic
+    r'|\*\*([^\*]+?)\*\*'                   # 3: bold
+    r'|__([^_]+?)__'                        # 4: underline
+    r'|(?<!\*)\*([^\*]+?)\*(?!\*)'          # 5: italic *
+    r'|(?<!_)_([^_]+?)_(?!_)',              # 6: italic _
+    re.DOTALL,
+)
+_MAX_UNWRAP_ROUNDS = 5
+# Any character that can start Discord formatting or an escape
+_MARKDOWN_TRIGGER_RE = re.compile(r'[*_~`|>\[\\]')
+_BLOCKQUOTE_RE = re.compile(r'^>>>?\s*', re.MULTILINE)
+_ESCAPE_RE = re.compile(r'\\([*_~`|>\\[\]])')
+
 
 # ---------- Markdown heading parsing ----------
 
@@ -26,18 +51,20 @@ def parse_markdown_headings(content: str) -> Tuple[str, Optional[str], str]:
     if not content:
         return "Untitled", None, ""
 
-    lines = content.splitlines()
+    # One pass: collect headings (# to ###) and keep every other non-subtext line
     headings = []
-
-    for i, line in enumerate(lines):
-        # Match headings (# to ###)
-        m = re.match(r'^(#{1,3})\s+(.+)$', line.strip())
+    cleaned_lines = []
+    for line in content.splitlines():
+        stripped = line.strip()
+        m = _HEADING_RE.match(stripped)
         if m:
-            lvl = len(m.group(1))
-            txt = m.group(2).strip()
             # Remove all Discord markdown formatting from heading
-            txt = remove_discord_formatting(txt)
-            headings.append((lvl, txt, i))
+            headings.append((len(m.group(1)), remove_discord_formatting(m.group(2).strip())))
+            continue
+        # Skip subtext lines (-#)
+        if _SUBTEXT_RE.match(stripped):
+            continue
+        cleaned_lines.append(line)
 
     title = None
     subtitle = None
@@ -47,18 +74,6 @@ def parse_markdown_headings(content: str) -> Tuple[str, Optional[str], str]:
         if len(headings) > 1 and headings[1][0] != headings[0][0]:
             subtitle = headings[1][1]  # ← REMOVED [:255] truncation
 
-    # Remove headings and subtext lines from content
-    cleaned_lines = []
-    for line in lines:
-        stripped = line.strip()
-        # Skip headings (# to ###)
-        if re.match(r'^#{1,3}\s+', stripped):
-            continue
-        # Skip subtext lines (-#)
-        if re.match(r'^-#\s+', stripped):
-            continue
-        cleaned_lines.append(line)
-
     cleaned_content = "\n".join(cleaned_lines).strip()
 
     return title or "Untitled", subtitle, cleaned_content
@@ -83,51 +98,37 @@ def remove_discord_formatting(text: str) -> str:
     if not text:
         return text
 
+    # Plain text (the common case) needs none of the passes below
+    if not _MARKDOWN_TRIGGER_RE.search(text):
+        return text.strip()
+
     # Remove code blocks first (```lang\ncode``` or ```code```)
-    text = re.sub(r'```[\s\S]*?```', lambda m: m.group(0).replace('```', '').strip(), text)
+    text = _CODE_BLOCK_RE.sub(lambda m: m.group(1).strip(), text)
 
     # Remove inline code (`code`)
-    text = re.sub(r'`([^`]+?)`', r'\1', text)
+    text = _INLINE_CODE_RE.sub(r'\1', text)
 
     # Remove spoilers (||text||)
-    text = re.sub(r'\|\|(.+?)\|\|', r'\1', text, flags=re.DOTALL)
+    text = _SPOILER_RE.sub(r'\1', text)
 
     # Remove strikethrough (~~text~~)
-    text = re.sub(r'~~(.+?)~~', r'\1', text, flags=re.DOTALL)
+    text = _STRIKE_RE.sub(r'\1', text)
 
     # Remove block quotes (> or >>> at line start)
-    text = re.sub(r'^>>>?\s*', '', text, flags=re.MULTILINE)
+    text = _BLOCKQUOTE_RE.sub('', text)
 
     # Remove masked links [text](url) - keep the text, remove the URL
-    text = re.sub(r'\[([^\]]+?)\]\([^\)]+?\)', r'\1', text)
-
-    # Multiple passes to handle all bold/italic/underline formatting
-    # This ensures we catch all instances even with emojis and special characters
-    max_iterations = 5
-    for _ in range(max_iterations):
-        original = text
-
-        # Remove ***text*** (bold + italic)
-        text = re.sub(r'\*\*\*(.+?)\*\*\*', r'\1', text, flags=re.DOTALL)
-        text = re.sub(r'___(.+?)___', r'\1', text, flags=re.DOTALL)
-
-        # Remove **text** (bold) - use DOTALL to match across any characters including emojis
-        text = re.sub(r'\*\*([^\*]+?)\*\*', r'\1', text, flags=re.DOTALL)
-
-        # Remove __text__ (underline/bold in Discord)
-        text = re.sub(r'__([^_]+?)__', r'\1', text, flags=re.DOTALL)
-
-        # Remove *text* (italic) - single asterisks
-        text = re.sub(r'(?<!\*)\*([^\*]+?)\*(?!\*)', r'\1', text, flags=re.DOTALL)
-
-        # Remove _text_ (italic) - single underscores
-        text = re.sub(r'(?<!_)_([^_]+?)_(?!_)', r'\1', text, flags=re.DOTALL)
+    text = _MASKED_LINK_RE.sub(r'\1', text)
 
-        # If nothing changed, we're done
-        if original == text:
+    # Strip every emphasis format in one scan per round; repeat so nested
+    # formatting (e.g. ***__text__***) unwraps layer by layer
+    for _ in range(_MAX_UNWRAP_ROUNDS):
+        new_text = _EMPHASIS_RE.sub(lambda m: m.group(m.lastindex), text)
+        if new_text == text:
             break
+        text = new_text
 
     # Clean up any remaining escape characters
-    text = re.sub(r'\\([*_~`|>\\[\]])', r'\1', text)
+    text = _ESCAPE_RE.sub(r'\1', text)
 
     return text.strip()
\ No newline at end of file
@@ -1,5 +1,6 @@
 # utils/normalize.py
 import re
+import string
 
 # --- Configurable limits ---
 MAX_TITLE_LEN = 255
@@ -7,6 +8,15 @@ MAX_SUBTITLE_LEN = 600
 MAX_CONTENT_LEN = 2000
 MAX_SLUG_LEN = 1200
 
+_WS_HT_RE = re.compile(r'[ \t]+')
+_MULTI_NL_RE = re.compile(r'\n{3,}')
+_SLUG_BAD_RE = re.compile(r'[^a-zA-Z0-9-_]+')
+# ASCII fast path: mark disallowed chars with NUL in one C-level translate,
+# then fold each run of marks into a single '-' (same result as _SLUG_BAD_RE)
+_SLUG_ALLOWED = frozenset(string.ascii_letters + string.digits + '-_')
+_SLUG_TABLE = str.maketrans({c: '\0' for c in map(chr, range(128)) if c not in _SLUG_ALLOWED})
+_SLUG_MARK_RUN_RE = re.compile('\0+')
+
 # --- Core truncation helpers ---
 
 def truncate_text(text: str, max_length: int, suffix: str = "...") -> str:
@@ -22,17 +32,17 @@ def clean_whitespace(text: str) -> str:
     if not text:
         return text
     # Replace multiple spaces (but NOT newlines) with single space
-    text = re.sub(r'[ \t]+', ' ', text)
+    text = _WS_HT_RE.sub(' ', text)
     # Replace 3+ newlines with just 2 (preserve paragraph breaks)
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _MULTI_NL_RE.sub('\n\n', text)
     return text.strip()
 
 def clean_whitespace_inline(text: str) -> str:
     """For titles/subtitles: collapse ALL whitespace including newlines."""
     if not text:
         return text
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+    # str.split() splits on exactly the characters \s matches, all in C
+    return ' '.join(text.split())
 
 def strip_or_none(s: str):
     """Strip text and convert empty strings to None."""
@@ -61,5 +71,8 @@ def normalize_content(content: str) -> str:
 def normalize_slug(slug: str) -> str:
     """Limit slug length and clean invalid chars."""
     slug = clean_whitespace_inline(slug)
-    slug = re.sub(r'[^a-zA-Z0-9-_]+', '-', slug)
+    if slug.isascii():
+        slug = _SLUG_MARK_RUN_RE.sub('-', slug.translate(_SLUG_TABLE))
+    else:
+        slug = _SLUG_BAD_RE.sub('-', slug)
     return truncate_text(slug.lower(), MAX_SLUG_LEN)
@@ -2,9 +2,14 @@ import asyncio
 import time
 import re
 import json
-import requests
+import logging
+import traceback
+from functools import lru_cache
+from http.cookies import SimpleCookie
 from urllib.parse import unquote
 from typing import Optional, Tuple
+import aiohttp
+import orjson
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -12,11 +17,44 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
+from utils.http import cookie_session
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+_COMMON_SIGN_US_RE = re.compile(r'p16-common-sign\.tiktokcdn-us\.com')
+_COMMON_SIGN_RE = re.compile(r'p16-common\.tiktokcdn\.com')
+_SIGI_STATE_RE = re.compile(r'<script id="SIGI_STATE"[^>]*>(.*?)</script>', re.S)
+
+# Fonts and trackers never matter for extraction; blocked in every driver via CDP
+_BLOCKED_URL_PATTERNS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*connect.facebook.net*",
+]
+
+# Every <video>/<img> with the attributes the DOM fallbacks read, in one WebDriver round trip
+# instead of one find_elements plus one get_attribute call per element and attribute
+_MEDIA_ELEMENTS_JS = """
+return Array.from(document.querySelectorAll('video,img')).map(e => ({
+    tag: e.tagName.toLowerCase(),
+    src: e.src || null,
+    srcset: e.getAttribute('srcset'),
+    poster: e.poster || null,
+    nw: e.naturalWidth || 0,
+    nh: e.naturalHeight || 0,
+    alt: e.alt || ''
+}));
+"""
 
 
 def get_selenium_driver():
     """Create and configure a Selenium WebDriver instance."""
     chrome_options = Options()
+    # get() returns at DOMContentLoaded; the load_*_page_sync waits cover the rest
+    chrome_options.page_load_strategy = 'eager'
     chrome_options.add_argument('--headless')
     chrome_options.add_argument('--no-sandbox')
     chrome_options.add_argument('--disable-dev-shm-usage')
@@ -25,12 +63,22 @@ def get_selenium_driver():
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
-    chrome_options.add_argument(
-        '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    # Extractors only read markup, embedded JSON and src/srcset/poster attributes, so don't
+    # download images or prompt for notifications
+    chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    chrome_options.add_argument(f'--user-agent={USER_AGENT}')
 
     driver = webdriver.Chrome(options=chrome_options)
     # Hide webdriver property
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URL_PATTERNS})
+    # Fixed by --user-agent above; lets session_from_selenium skip a navigator.userAgent round trip
+    driver._ua = USER_AGENT
     return driver
 
 
@@ -41,45 +89,85 @@ async def create_driver():
 
 async def quit_driver(driver):
     """Safely quit driver in thread pool."""
+    await close_selenium_session(driver)
     try:
         await asyncio.to_thread(driver.quit)
     except Exception as e:
         print(f"DEBUG - Error closing driver: {e}")
 
 # 1) Robust JSON extractor for SIGI_STATE / other variants
-def extract_tiktok_json_driver(driver):
+# (marker, token that ends the marker, token that ends the JSON); located with str.find so the
+# regex engine never walks the (often >1 MB) page source
+_TIKTOK_JSON_MARKERS = (
+    ('<script id="SIGI_STATE"', '>', '</script>'),
+    ('window.__INIT_PROPS__', '=', '};'),           # sometimes used
+    ('window["SIGI_STATE"]', '=', '};'),
+    ('window.__INIT_DATA__', '=', '};'),
+)
+_last_json_marker = 0
+
+
+def _slice_after_marker(html: str, marker: str, opener: str, closer: str) -> Optional[str]:
+    """Text between `opener` (after `marker`) and the next `closer`, or None."""
+    idx = html.find(marker)
+    if idx == -1:
+        return None
+    start = html.find(opener, idx + len(marker))
+    if start == -1:
+        return None
+    start += len(opener)
+    end = html.find(closer, start)
+    if end == -1:
+        return None
+    if closer == '};':
+        # Assignment variants: keep the closing brace, drop the semicolon
+        txt = html[start:end + 1].strip()
+        return txt if txt.startswith('{') else None
+    txt = html[start:end].strip()
+    # Some variants assign to a var: strip trailing semicolon
+    if txt.endswith(';'):
+        txt = txt[:-1]
+    return txt
+
+
+def extract_tiktok_json_driver(driver, html: Optional[str] = None):
     """
     Try several patterns for the JSON blob TikTok embeds. Returns parsed dict or None.
+    Pass `html` when the page source was already fetched to skip another WebDriver round trip.
     """
-    html = driver.page_source
-
-    # Try common script id
-    patterns = [
-        r'<script id="SIGI_STATE"[^>]*>(.*?)</script>',
-        r'window\.__INIT_PROPS__\s*=\s*({.*?});',           # sometimes used
-        r'window\["SIGI_STATE"\]\s*=\s*({.*?});',
-        r'window\.__INIT_DATA__\s*=\s*({.*?});',
-    ]
-
-    for pat in patterns:
-        m = re.search(pat, html, re.S)
-        if m:
-            txt = m.group(1).strip()
-            # Some variants assign to a var: strip trailing semicolon
-            if txt.endswith(';'):
-                txt = txt[:-1]
+    if html is None:
+        html = driver.page_source
+    return extract_tiktok_json_from_html(html)
+
+
+def extract_tiktok_json_from_html(html: str):
+    """The JSON blob TikTok embeds in `html` (from a browser or a plain GET), parsed, or None."""
+    global _last_json_marker
+    # Pages almost always use the same container, so try the last one that worked first
+    first = _last_json_marker
+    order = (first,) + tuple(i for i in range(len(_TIKTOK_JSON_MARKERS)) if i != first)
+    for i in order:
+        marker, opener, closer = _TIKTOK_JSON_MARKERS[i]
+        txt = _slice_after_marker(html, marker, opener, closer)
+        if txt is None:
+            continue
+        try:
+            data = orjson.loads(txt)
+        except Exception:
+            # Try to fix single quotes or JS-like structures: not ideal but sometimes needed
             try:
-                return json.loads(txt)
+                txt_fixed = txt.replace("'", '"')
+                data = json.loads(txt_fixed)
             except Exception:
-                # Try to fix single quotes or JS-like structures: not ideal but sometimes needed
-                try:
-                    txt_fixed = txt.replace("'", '"')
-                    return json.loads(txt_fixed)
-                except Exception:
-                    continue
+                continue
+        _last_json_marker = i
+        return data
     return None
 
 # 2) Normalize and choose best media URL from parsed JSON structure
+_MEDIA_URL_EXTS = frozenset(("mp4", "m3u8", "jpeg", "jpg", "png"))
+
+
 def choose_best_media_from_json(data):
     """
     Return (media_url, cover_url, media_type) where media_type in {"video","image"}.
@@ -138,116 +226,220 @@ def choose_best_media_from_json(data):
 
     # 2b: fallback to other common keys
     # Sometimes the JSON has "ItemList"/"media" etc. Try scanning for any http(s) URLs ending in .mp4/.jpeg
-    whole = json.dumps(data)
-    candidates = re.findall(r'https?://[^\s"\']+\.(?:mp4|m3u8|jpeg|jpg|png)', whole)
-    if candidates:
-        # prefer mp4
-        for c in candidates:
-            if c.endswith(".mp4"):
-                return c, None, "video"
-        return candidates[0], candidates[0], "image"
+    first = None
+    for v in _iter_strs(data):
+        if v.startswith(("http://", "https://")):
+            ext = v.split("?", 1)[0].rsplit(".", 1)[-1]
+            if ext in _MEDIA_URL_EXTS:
+                # prefer mp4
+                if ext == "mp4":
+                    return v, None, "video"
+                if first is None:
+                    first = v
+    if first:
+        return first, first, "image"
 
     return None, None, None
 
-# 3) Helper: export cookies from selenium into requests.Session
-def session_from_selenium(driver):
-    s = requests.Session()
+
+def _iter_strs(obj):
+    """Yield every string leaf of a parsed JSON structure, in document order."""
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            yield node
+        elif isinstance(node, dict):
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+# 3) Helper: export cookies from selenium into an aiohttp session on the shared pool
+def _cookie_fingerprint(cookies) -> int:
+    return hash(tuple(sorted((c['name'], c['value']) for c in cookies)))
+
+
+async def session_from_selenium(driver) -> aiohttp.ClientSession:
+    """
+    Cookie session mirroring the driver's cookies. Cached on the driver and rebuilt
+    only when its cookies change, so repeat extractions skip the rebuild.
+    """
+    cookies = await asyncio.to_thread(driver.get_cookies)
+    fingerprint = _cookie_fingerprint(cookies)
+    cached = getattr(driver, "_cached_http_session", None)
+    if cached is not None and not cached.closed and getattr(driver, "_cookie_fp", None) == fingerprint:
+        return cached
+
+    user_agent = getattr(driver, "_ua", None)
+    if user_agent is None:
+        user_agent = await asyncio.to_thread(driver.execute_script, "return navigator.userAgent") or "Mozilla/5.0"
+    jar = aiohttp.CookieJar()
+    for c in cookies:
+        morsel = SimpleCookie()
+        morsel[c['name']] = c['value']
+        if c.get('domain'):
+            morsel[c['name']]['domain'] = c['domain']
+        jar.update_cookies(morsel)
     # set sensible headers
-    s.headers.update({
-        "User-Agent": driver.execute_script("return navigator.userAgent") or "Mozilla/5.0",
+    session = cookie_session(jar, headers={
+        "User-Agent": user_agent,
         "Referer": "https://www.tiktok.com/",
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
     })
-    for c in driver.get_cookies():
-        s.cookies.set(c['name'], c['value'], domain=c.get('domain'))
-    return s
+    if cached is not None:
+        await cached.close()
+    driver._cached_http_session = session
+    driver._cookie_fp = fingerprint
+    return session
+
+
+async def close_selenium_session(driver):
+    """Close the cookie session cached on `driver`, if any."""
+    session = getattr(driver, "_cached_http_session", None)
+    if session is not None:
+        driver._cached_http_session = None
+        await session.close()
 
 # 4) Try to request the URL with session; follow redirects and return final URL and status
-def fetch_url_with_session(session, url, method="head", timeout=8):
+async def fetch_url_with_session(session, url, method="head", timeout=8):
     try:
         # unquote sometimes helps with %7e issues
         url = unquote(url)
-        if method == "head":
-            r = session.head(url, allow_redirects=True, timeout=timeout)
-        else:
-            r = session.get(url, allow_redirects=True, timeout=timeout, stream=True)
-        return r.status_code, r.url, r
-    except Exception as e:
-        return None, None, None
+        async with session.request(
+            method.upper(), url, allow_redirects=True, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as r:
+            return r.status, str(r.url)
+    except Exception:
+        return None, None
 
 # 5) Rewriting common-sign host -> sign host heuristic
+@lru_cache(maxsize=4096)
 def rewrite_common_sign(url):
     if not url:
         return url
     # replace the common-sign host with a sign host that often works
-    url = re.sub(r'p16-common-sign\.tiktokcdn-us\.com', 'p16-sign.tiktokcdn.com', url)
-    url = re.sub(r'p16-common\.tiktokcdn\.com', 'p16-sign.tiktokcdn.com', url)
+    url = _COMMON_SIGN_US_RE.sub('p16-sign.tiktokcdn.com', url)
+    url = _COMMON_SIGN_RE.sub('p16-sign.tiktokcdn.com', url)
     # try removing tplv or replacing ~ encodings
     url = url.replace('%7e', '~')
     # sometimes swap region suffixes
     return url
 
+
+def _media_elements_sync(driver) -> list:
+    """Snapshot of the page's <video>/<img> elements as dicts (see _MEDIA_ELEMENTS_JS)."""
+    return driver.execute_script(_MEDIA_ELEMENTS_JS) or []
+
+
+def _dom_media_candidates(driver):
+    """(url, media_type, try_rewrite) for <video> src/poster, then <img> src; in preference order."""
+    elements = _media_elements_sync(driver)
+    candidates = []
+    for v in elements:
+        if v["tag"] != "video":
+            continue
+        if v["src"]:
+            candidates.append((v["src"], "video", True))
+        if v["poster"]:
+            candidates.append((v["poster"], "video", False))
+    for img in elements:
+        if img["tag"] == "img" and img["src"]:
+            candidates.append((img["src"], "image", True))
+    return candidates
+
+
+async def _probe(session, url, kind):
+    """Return (final_url, kind) if a HEAD succeeds, else None."""
+    status, final = await fetch_url_with_session(session, url, method="head")
+    logger.debug("HEAD %s -> status=%s final=%s", url, status, final)
+    if status and status < 400:
+        return final or url, kind
+    return None
+
+
+def _expand_candidates(candidates, seen: set):
+    """(url, kind) probes for `candidates`, each followed by its common-sign rewrite; skips `seen`."""
+    probes = []
+    for url, kind, try_rewrite in candidates:
+        urls = (url, rewrite_common_sign(url)) if try_rewrite else (url,)
+        for u in urls:
+            if u not in seen:
+                seen.add(u)
+                probes.append((u, kind))
+    return probes
+
+
+async def _first_usable(session, probes):
+    """
+    HEAD every probe at once but keep the preference order of `probes`: the earliest
+    success wins once every probe before it has failed, and the rest are cancelled.
+    """
+    tasks = [asyncio.create_task(_probe(session, u, kind)) for u, kind in probes]
+    try:
+        for task in tasks:
+            try:
+                usable = await task
+            except Exception:
+                continue
+            if usable:
+                return usable
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return None
+
+
 # 6) High-level helper to get a usable media URL
-def get_usable_tiktok_media_url(driver):
+async def get_usable_tiktok_media_url(driver, html: Optional[str] = None):
     # 1) parse JSON
-    data = extract_tiktok_json_driver(driver)
+    data = await asyncio.to_thread(extract_tiktok_json_driver, driver, html)
     media_url, cover, mtype = choose_best_media_from_json(data)
-    print(f"DEBUG - JSON choose: {media_url} ({mtype})")
+    logger.debug("JSON choose: %s (%s)", media_url, mtype)
 
-    s = session_from_selenium(driver)
+    seen = set()
+    s = None
 
-    # If JSON gave a URL, attempt to HEAD it using session cookies
+    # 2) JSON pick and its rewrite, probed together with the driver's cookies
     if media_url:
-        status, final, resp = fetch_url_with_session(s, media_url, method="head")
-        print(f"DEBUG - HEAD {media_url} -> status={status} final={final}")
-        if status and status < 400:
-            return final or media_url, mtype
-
-        # try rewriting host if access denied
-        rewritten = rewrite_common_sign(media_url)
-        if rewritten != media_url:
-            status, final, resp = fetch_url_with_session(s, rewritten, method="head")
-            print(f"DEBUG - HEAD rewritten {rewritten} -> status={status} final={final}")
-            if status and status < 400:
-                return final or rewritten, mtype
-
-    # 2) Fallback to DOM method you already have (video tag / poster / img)
+        s = await session_from_selenium(driver)
+        usable = await _first_usable(s, _expand_candidates([(media_url, mtype, True)], seen))
+        if usable:
+            return usable
+
+    # 3) Fallback to the DOM (video tag / poster / img)
     try:
-        from selenium.webdriver.common.by import By
-        videos = driver.find_elements(By.TAG_NAME, "video")
-        for v in videos:
-            src = v.get_attribute("src")
-            poster = v.get_attribute("poster")
-            if src:
-                status, final, _ = fetch_url_with_session(s, src, method="head")
-                if status and status < 400:
-                    return final or src, "video"
-                # try rewrite
-                rsrc = rewrite_common_sign(src)
-                status, final, _ = fetch_url_with_session(s, rsrc, method="head")
-                if status and status < 400:
-                    return final or rsrc, "video"
-            if poster:
-                status, final, _ = fetch_url_with_session(s, poster, method="head")
-                if status and status < 400:
-                    return final or poster, "video"
-
-        imgs = driver.find_elements(By.TAG_NAME, "img")
-        for img in imgs:
-            src = img.get_attribute("src")
-            if src:
-                status, final, _ = fetch_url_with_session(s, src, method="head")
-                if status and status < 400:
-                    return final or src, "image"
-                rsrc = rewrite_common_sign(src)
-                status, final, _ = fetch_url_with_session(s, rsrc, method="head")
-                if status and status < 400:
-                    return final or rsrc, "image"
+        candidates = await asyncio.to_thread(_dom_media_candidates, driver)
     except Exception as e:
-        print(f"DEBUG - DOM fallback error: {e}")
+        logger.debug("DOM fallback error: %s", e)
+        return None, None
+    probes = _expand_candidates(candidates, seen)
+    if not probes:
+        return None, None
+    if s is None:
+        s = await session_from_selenium(driver)
+    usable = await _first_usable(s, probes)
+    if usable:
+        return usable
 
     return None, None
 
+# Any of these means the page has rendered enough to extract from (structure varies); one
+# comma-joined selector polls them all in a single wait instead of one 3 s wait each
+_INSTAGRAM_READY_SELECTOR = "img[srcset], video, article, main, [role='main']"
+_TIKTOK_READY_SELECTOR = "video, [data-e2e='browse-video'], img[alt], main, #main-content-video_detail"
+
+
+def _wait_for_any(driver, css_selector: str, timeout: float = 5) -> bool:
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, css_selector))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
 def load_instagram_page_sync(driver, url: str) -> str:
     """
     Load Instagram page and wait for content to appear.
@@ -255,26 +447,11 @@ def load_instagram_page_sync(driver, url: str) -> str:
     """
     driver.get(url)
 
-    # Try multiple selectors - Instagram's structure varies
-    selectors_to_try = [
-        (By.CSS_SELECTOR, "img[srcset]"),
-        (By.TAG_NAME, "video"),
-        (By.TAG_NAME, "article"),
-        (By.CSS_SELECTOR, "main"),
-        (By.CSS_SELECTOR, "[role='main']"),
-    ]
-
-    for selector_type, selector_value in selectors_to_try:
-        try:
-            WebDriverWait(driver, 3).until(
-                EC.presence_of_element_located((selector_type, selector_value))
-            )
-            print(f"DEBUG - Found element with selector: {selector_value}")
-            # Short wait for images to load after element is found
-            time.sleep(0.5)
-            return driver.page_source
-        except TimeoutException:
-            continue
+    if _wait_for_any(driver, _INSTAGRAM_READY_SELECTOR):
+        print("DEBUG - Found Instagram content element")
+        # Short wait for images to load after element is found
+        time.sleep(0.5)
+        return driver.page_source
 
     print(f"DEBUG - No expected elements found, proceeding anyway")
     return driver.page_source
@@ -285,22 +462,32 @@ async def load_instagram_page(driver, url: str) -> str:
     return await asyncio.to_thread(load_instagram_page_sync, driver, url)
 
 
+def _srcset_urls(srcset: str, schemes: Tuple[str, ...]) -> list:
+    """URLs of the srcset candidates ("url [descriptor], ...") that start with one of `schemes`."""
+    urls = []
+    for part in srcset.split(','):
+        url = part.split(None, 1)[0] if part.strip() else ''
+        if url.startswith(schemes):
+            urls.append(url)
+    return urls
+
+
 def find_video_sync(driver) -> Tuple[Optional[str], Optional[str]]:
     """
     Find video element in the page.
     Returns (video_url, media_type) or (None, None).
     """
     try:
-        video_elements = driver.find_elements(By.TAG_NAME, "video")
+        video_elements = [e for e in _media_elements_sync(driver) if e["tag"] == "video"]
         print(f"DEBUG - Found {len(video_elements)} video elements")
         if video_elements:
             for video in video_elements:
-                src = video.get_attribute("src")
+                src = video["src"]
                 if src and src.startswith("http"):
                     print(f"DEBUG - Found video element: {src[:100]}")
                     return src, "video"
                 # Try poster attribute as fallback
-                poster = video.get_attribute("poster")
+                poster = video["poster"]
                 if poster and poster.startswith("http"):
                     print(f"DEBUG - Found video poster: {poster[:100]}")
                     return poster, "video"
@@ -316,15 +503,15 @@ def find_image_sync(driver) -> Tuple[Optional[str], Optional[str]]:
     """
     try:
         # Look for all img elements
-        img_elements = driver.find_elements(By.TAG_NAME, "img")
+        img_elements = [e for e in _media_elements_sync(driver) if e["tag"] == "img"]
         print(f"DEBUG - Found {len(img_elements)} img elements")
 
         best_img = None
         max_size = 0
 
         for img in img_elements:
-            src = img.get_attribute("src")
-            srcset = img.get_attribute("srcset")
+            src = img["src"]
+            srcset = img["srcset"]
 
             if not src or not src.startswith("http"):
                 continue
@@ -337,11 +524,7 @@ def find_image_sync(driver) -> Tuple[Optional[str], Optional[str]]:
 
             # If srcset is available, parse for highest resolution
             if srcset:
-                urls = []
-                for part in srcset.split(','):
-                    url_match = re.match(r'\s*(https?://[^\s]+)', part.strip())
-                    if url_match:
-                        urls.append(url_match.group(1))
+                urls = _srcset_urls(srcset, ('http://', 'https://'))
                 if urls:
                     # Get the last URL (usually highest res)
                     src = urls[-1]
@@ -353,17 +536,10 @@ def find_image_sync(driver) -> Tuple[Optional[str], Optional[str]]:
                 return src, "image"
 
             # Track largest cropped image as fallback
-            try:
-                width = img.get_attribute("naturalWidth")
-                height = img.get_attribute("naturalHeight")
-                if width and height:
-                    size = int(width) * int(height)
-                    if size > max_size:
-                        max_size = size
-                        best_img = src
-            except:
-                if not best_img:
-                    best_img = src
+            size = img["nw"] * img["nh"]
+            if size > max_size:
+                max_size = size
+                best_img = src
 
         if best_img:
             print(f"DEBUG - Using best available image: {best_img[:150]}")
@@ -371,7 +547,6 @@ def find_image_sync(driver) -> Tuple[Optional[str], Optional[str]]:
 
     except Exception as e:
         print(f"DEBUG - Error finding image: {e}")
-        import traceback
         traceback.print_exc()
     return None, None
 
@@ -387,10 +562,6 @@ async def extract_media_from_selenium(driver, is_reel=False):
     Returns:
         Tuple of (media_url, media_type)
     """
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-
     try:
         # Give page time to load
         await asyncio.sleep(2)
@@ -482,7 +653,7 @@ async def extract_media_from_selenium(driver, is_reel=False):
 
                         if srcset:
                             # Parse srcset to get highest resolution
-                            urls = re.findall(r'(https://[^\s]+)', srcset)
+                            urls = _srcset_urls(srcset, ('https://',))
                             if urls:
                                 src = max(urls, key=len)
 
@@ -515,7 +686,6 @@ async def extract_media_from_selenium(driver, is_reel=False):
 
     except Exception as e:
         print(f"ERROR in extract_media_from_selenium: {e}")
-        import traceback
         traceback.print_exc()
         return None, "video" if is_reel else "image"
 
@@ -527,25 +697,11 @@ def load_tiktok_page_sync(driver, url: str) -> str:
     """
     driver.get(url)
 
-    # Try multiple selectors for TikTok's structure
-    selectors_to_try = [
-        (By.TAG_NAME, "video"),
-        (By.CSS_SELECTOR, "[data-e2e='browse-video']"),
-        (By.CSS_SELECTOR, "img[alt]"),
-        (By.CSS_SELECTOR, "main"),
-        (By.ID, "main-content-video_detail"),
-    ]
-
-    for selector_type, selector_value in selectors_to_try:
-        try:
-            WebDriverWait(driver, 3).until(
-                EC.presence_of_element_located((selector_type, selector_value))
-            )
-            print(f"DEBUG - Found TikTok element with selector: {selector_value}")
-            time.sleep(0.5)
-            return driver.page_source
-        except TimeoutException:
-            continue
+    if _wait_for_any(driver, _TIKTOK_READY_SELECTOR):
+        print("DEBUG - Found TikTok content element")
+        # SIGI_STATE ships in the initial HTML; drop whatever is still loading
+        driver.execute_cdp_cmd("Page.stopLoading", {})
+        return driver.page_source
 
     print(f"DEBUG - No expected TikTok elements found, proceeding anyway")
     return driver.page_source
@@ -563,12 +719,12 @@ def extract_tiktok_json_media(driver):
     """
     try:
         html = driver.page_source
-        match = re.search(r'<script id="SIGI_STATE"[^>]*>(.*?)</script>', html, re.S)
+        match = _SIGI_STATE_RE.search(html)
         if not match:
             print("DEBUG - No SIGI_STATE JSON found")
             return None, None
 
-        data = json.loads(match.group(1))
+        data = orjson.loads(match.group(1))
         item_module = data.get("ItemModule", {})
         if not item_module:
             print("DEBUG - No ItemModule found in SIGI_STATE")
@@ -598,7 +754,6 @@ def extract_tiktok_json_media(driver):
 
     except Exception as e:
         print(f"DEBUG - Error parsing SIGI_STATE: {e}")
-        import traceback
         traceback.print_exc()
         return None, None
 
@@ -611,18 +766,20 @@ def find_tiktok_media_sync(driver) -> Tuple[Optional[str], str, Optional[str]]:
     cover_url = None
 
     try:
+        elements = _media_elements_sync(driver)
+
         # Look for video elements
-        video_elements = driver.find_elements(By.TAG_NAME, "video")
+        video_elements = [e for e in elements if e["tag"] == "video"]
         print(f"DEBUG - Found {len(video_elements)} video elements")
 
         for video in video_elements:
-            src = video.get_attribute("src")
+            src = video["src"]
             if src and src.startswith("http"):
                 print(f"DEBUG - Found TikTok video: {src[:100]}")
                 video_url = src
 
             # Get poster/cover image
-            poster = video.get_attribute("poster")
+            poster = video["poster"]
             if poster and poster.startswith("http"):
                 print(f"DEBUG - Found TikTok cover: {poster[:100]}")
                 cover_url = poster
@@ -632,12 +789,11 @@ def find_tiktok_media_sync(driver) -> Tuple[Optional[str], str, Optional[str]]:
 
         # If no video src, try to find cover images
         if not cover_url:
-            img_elements = driver.find_elements(By.TAG_NAME, "img")
+            img_elements = [e for e in elements if e["tag"] == "img"]
             print(f"DEBUG - Found {len(img_elements)} img elements")
 
             for img in img_elements:
-                src = img.get_attribute("src")
-                alt = img.get_attribute("alt")
+                src = img["src"]
 
                 if not src or not src.startswith("http"):
                     continue
@@ -660,13 +816,12 @@ def find_tiktok_media_sync(driver) -> Tuple[Optional[str], str, Optional[str]]:
 
     except Exception as e:
         print(f"DEBUG - Error finding TikTok media: {e}")
-        import traceback
         traceback.print_exc()
 
     return None, "video", None
 
 
-async def extract_tiktok_media(driver) -> Tuple[Optional[str], str]:
+async def extract_tiktok_media(driver, page_source: Optional[str] = None) -> Tuple[Optional[str], str]:
     """
     Extract media URL and type from a TikTok page using Selenium.
     Tries JSON extraction, cookie-authenticated requests, and DOM fallbacks.
@@ -674,8 +829,8 @@ async def extract_tiktok_media(driver) -> Tuple[Optional[str], str]:
     """
     print("DEBUG - Starting TikTok media extraction with Selenium")
 
-    # Use the new robust unified helper (runs in thread to avoid blocking)
-    media_url, media_type = await asyncio.to_thread(get_usable_tiktok_media_url, driver)
+    # Use the new robust unified helper (WebDriver calls run in threads, probes are async)
+    media_url, media_type = await get_usable_tiktok_media_url(driver, page_source)
 
     if media_url:
         print(f"DEBUG - ✅ Final usable TikTok media: {media_url} ({media_type})")
@@ -1,11 +1,19 @@
 import re
-from typing import Optional, List
+from functools import lru_cache
+from typing import Optional, List, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only track the click and never change the linked content
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "igsh", "si", "ref_src"}
+
+_SLUG_STRIP_RE = re.compile(r"[^\w\s-]")
+_SLUG_SEP_RE = re.compile(r"[-\s]+")
 
 def slugify(text: str, max_len: int = 1200) -> str:
     if not text:
         return "untitled"
-    s = re.sub(r"[^\w\s-]", "", text.lower())
-    s = re.sub(r"[-\s]+", "-", s).strip("-")
+    s = _SLUG_STRIP_RE.sub("", text.lower())
+    s = _SLUG_SEP_RE.sub("-", s).strip("-")
     return s[:max_len]
 
 
@@ -16,8 +24,61 @@ def strip_or_none(s: Optional[str]) -> Optional[str]:
     return s2 if s2 else None
 
 
+# Characters that end a URL besides whitespace
+_URL_TERMINATORS = frozenset('<>"')
+
+
+def split_urls_from_text(text: str) -> Tuple[List[str], str]:
+    """
+    Find http(s) URLs with a single linear scan (no regex backtracking).
+    Returns (urls, text with the URLs removed).
+    """
+    if not text or 'http' not in text:
+        return [], text or ""
+
+    urls = []
+    rest = []
+    n = len(text)
+    i = 0      # scan position
+    start = 0  # start of the current non-URL slice
+    while True:
+        j = text.find('http', i)
+        if j < 0:
+            break
+        if text.startswith(('http://', 'https://'), j):
+            k = text.index('//', j) + 2
+            if k < n and not text[k].isspace() and text[k] not in _URL_TERMINATORS:
+                while k < n and not text[k].isspace() and text[k] not in _URL_TERMINATORS:
+                    k += 1
+                urls.append(text[j:k])
+                rest.append(text[start:j])
+                start = k
+            i = k
+        else:
+            i = j + 4
+    rest.append(text[start:])
+    return urls, "".join(rest)
+
+
 def extract_urls_from_text(text: str) -> List[str]:
-    if not text:
-        return []
-    url_pattern = r'https?://[^\s<>"]+'
-    return re.findall(url_pattern, text)
\ No newline at end of file
+    return split_urls_from_text(text)[0]
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for cache keys: lowercase host, no fragment or tracking params."""
+    parts = urlsplit(url.strip())
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in TRACKING_PARAMS and not k.startswith("utm_")
+    ]
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, urlencode(query), ""))
+
+
+@lru_cache(maxsize=1024)
+def registered_domain(url: str) -> str:
+    """
+    Last two labels of the URL's host, e.g. 'https://vm.tiktok.com/x' -> 'tiktok.com'.
+    Good enough for dispatching on the platforms we support (no multi-part TLDs).
+    Memoized because the same URL is dispatched on by the processor, link and media paths.
+    """
+    host = urlsplit(url).hostname or ""
+    return ".".join(host.rsplit(".", 2)[-2:])